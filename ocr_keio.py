@@ -1,85 +1,240 @@
-import re, csv, sys, datetime, cv2
+import os
+# OpenMP の多重スレッドは遅くなりがちなので単一スレッド化し、パス単位でプロセス並列にする
+os.environ.setdefault("OMP_THREAD_LIMIT","1")
+import re, csv, sys, datetime, cv2, multiprocessing, hashlib, functools, pickle
 import numpy as np
-import pytesseract
-from pytesseract import Output
 from PIL import Image
 
+# tesserocr があればエンジンを常駐させてプロセス起動/一時PNGを省く（無ければ pytesseract）
+try:
+    from tesserocr import PyTessBaseAPI, RIL, iterate_level
+    HAVE_TESSEROCR=True
+except Exception:
+    HAVE_TESSEROCR=False
+    import pytesseract
+    from pytesseract import Output
+
 UNIV="慶應義塾大学"; GRAD="商学研究科"
 MAJOR="商業学分野 Commercial science (Marketing)"
 SRC="https://www.fbc.keio.ac.jp/graduate/shougyou.html"
 OUT="keio_marketing_ocr.csv"
+CACHE_DIR=os.path.join(".cache","ocr")
+CLAHE=cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+# 前処理やOCR結果の形式を変えたら上げる（古いキャッシュを使わないため）
+PREP_VERSION=5
+DATA_COLS=["block_num","par_num","line_num","left","top","width","height","conf","text"]
+
+NAME_RE=re.compile(r"[一-龥々〆ヵヶ]{1,3}[ \u3000]+[一-龥々〆ヵヶ]{1,3}")
+ROMAN_RE=re.compile(r"[A-Za-z]{2,}(?:[ -][A-Za-z\-]{2,})+")
+NAME_LOOSE_RE=re.compile(r"[一-龥々〆ヵヶ]{1,4}[ \u3000][一-龥々〆ヵヶ]{1,4}")
+KANJI_RUN_RE=re.compile(r"[一-龥々〆ヵヶ]{4,6}")
+_BRACKETS=re.compile(r"[（）\(\)\[\]【】]+")
+_SEP=re.compile(r"[、，,/／・\n]+")
+_ALNUM=re.compile(r"[A-Za-z0-9]")
+_LATIN=re.compile(r"[A-Za-z]")
+_KANJI_ONLY=re.compile(r"[一-龥々〆ヵヶぁ-んァ-ンー・]+")
+_ROMAN_WORD=re.compile(r"[A-Za-z\-]{2,}")
+_NON_KANJI=re.compile(r"[^一-龥々〆ヵヶ]")
+_BLANK_LINES=re.compile(r"\n\s*\n")
+
+KEYWORDS=["マーケティング","消費者","流通","統計","イノベーション","サイエンス","計量","リサーチ"]
+NG=["書房","Journal","ジャーナル","Vol.","pp."]
+TITLES=["教授","准教授","特任教授","助教","担当者"]
+# 職名を含む行の「次の行」にある氏名（フォールバック用、本文全体を1回で走査）
+TITLE_NAME_RE=re.compile(r"^[^\n]*(?:%s)[^\n]*\n[^\n]*?(?P<name>%s)"%("|".join(TITLES), NAME_RE.pattern), re.M)
+# 一次パス（テキストブロック）でこの件数が取れたら、位置情報OCR/フォールバックは省く
+EXPECTED_MIN=3
 
-NAME_RE=r"[一-龥々〆ヵヶ]{1,3}[ \u3000]+[一-龥々〆ヵヶ]{1,3}"
-ROMAN_RE=r"[A-Za-z]{2,}(?:[ -][A-Za-z\-]{2,})+"
+# 複数キーワードの包含判定を1パスで行う（pyahocorasick があれば Aho-Corasick、無ければ正規表現の選言）
+try:
+    import ahocorasick
+    def _keyword_finder(words):
+        A=ahocorasick.Automaton()
+        for k in words: A.add_word(k,k)
+        A.make_automaton()
+        return lambda s: ((end-len(k)+1) for end,k in A.iter(s))
+except ImportError:
+    def _keyword_finder(words):
+        pat=re.compile("|".join(map(re.escape,words)))
+        return lambda s: (m.start() for m in pat.finditer(s))
+
+_find_keyword=_keyword_finder(KEYWORDS)
+_find_ng=_keyword_finder(NG)
+
+def _has_any(finder, s:str)->bool:
+    return next(finder(s), None) is not None
 
 def normalize_themes(s:str)->str:
-    s=re.sub(r"[（）\(\)\[\]【】]+"," ",s)
-    parts=re.split(r"[、，,/／・\n]+",s)
+    s=_BRACKETS.sub(" ",s)
+    parts=_SEP.split(s)
     cleaned=[]
     for p in parts:
         p=p.strip(" 　")
         if not p: continue
         # 英数字が混じる行や長文は除外
-        if re.search(r"[A-Za-z0-9]", p):
+        if _ALNUM.search(p):
             continue
         if len(p)>20:
             continue
-        if not re.fullmatch(r"[一-龥々〆ヵヶぁ-んァ-ンー・]+", p):
+        if not _KANJI_ONLY.fullmatch(p):
             continue
         cleaned.append(p)
     return " / ".join(cleaned[:12])
 
+_APIS={}
+
+def _api(lang:str):
+    api=_APIS.get(lang)
+    if api is None:
+        api=_APIS[lang]=PyTessBaseAPI(lang=lang)
+    return api
+
+def close_apis():
+    for api in _APIS.values():
+        api.End()
+    _APIS.clear()
+
+def tess_string(img, lang:str="jpn+eng", psm:int=3)->str:
+    if not HAVE_TESSEROCR:
+        return pytesseract.image_to_string(img, lang=lang, config=f"--psm {psm}")
+    api=_api(lang)
+    api.SetPageSegMode(psm)
+    api.SetImage(Image.fromarray(img) if isinstance(img,np.ndarray) else img)
+    return api.GetUTF8Text()
+
+def tess_data(gray, lang:str="jpn+eng", psm:int=6):
+    if not HAVE_TESSEROCR:
+        d=pytesseract.image_to_data(gray, lang=lang, output_type=Output.DICT, config=f"--psm {psm}")
+        return {k:np.asarray(d[k]) for k in DATA_COLS}
+    api=_api(lang)
+    api.SetPageSegMode(psm)
+    api.SetImage(Image.fromarray(gray))
+    api.Recognize()
+    # image_to_data と同じ列（block/par/line 番号 + 座標 + text）を単語単位で組み立てる
+    d={k:[] for k in DATA_COLS}; b=p=l=0
+    for it in iterate_level(api.GetIterator(), RIL.WORD):
+        if it.IsAtBeginningOf(RIL.BLOCK): b+=1; p=l=0
+        if it.IsAtBeginningOf(RIL.PARA): p+=1; l=0
+        if it.IsAtBeginningOf(RIL.TEXTLINE): l+=1
+        box=it.BoundingBox(RIL.WORD)
+        if not box: continue
+        try:
+            txt=it.GetUTF8Text(RIL.WORD)
+        except RuntimeError:
+            continue
+        x1,y1,x2,y2=box
+        for k,v in zip(DATA_COLS,(b,p,l,x1,y1,x2-x1,y2-y1,it.Confidence(RIL.WORD),txt)):
+            d[k].append(v)
+    return {k:np.asarray(v) for k,v in d.items()}
+
+def image_key(path:str)->str:
+    with open(path,"rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+def prepare(path:str):
+    # 最初からグレースケールで読み、以降は同じバッファを dst= で使い回す（BGR 3ch の中間配列を作らない）
+    gray=cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if gray is None: raise SystemExit("画像が読めません: "+path)
+    h,w=gray.shape[:2]
+    if max(h,w)<1600: gray=cv2.resize(gray,(int(w*1.6),int(h*1.6)))
+    # 見出しと表でコントラストが違うため、全体Otsuではなく CLAHE + 軽いぼかし + 適応的二値化
+    CLAHE.apply(gray, gray)
+    cv2.GaussianBlur(gray,(3,3),0,dst=gray)
+    cv2.adaptiveThreshold(gray,255,cv2.ADAPTIVE_THRESH_GAUSSIAN_C,cv2.THRESH_BINARY,31,10,dst=gray)
+    return crop_content(gray)
+
+def crop_content(gray, pad:int=10, min_area:int=100):
+    # 文字のある領域だけに切り詰め、余白や枠外の画素を Tesseract に渡さない
+    edges=cv2.Canny(gray,50,150)
+    dil=cv2.dilate(edges, np.ones((5,30),np.uint8))
+    cnts,_=cv2.findContours(dil, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    rects=[cv2.boundingRect(c) for c in cnts]
+    rects=[r for r in rects if r[2]*r[3]>=min_area]
+    if not rects: return gray
+    # 最大輪郭だけだと段落1つに縮むことがあるので、有意な輪郭すべての外接矩形を使う
+    H,W=gray.shape[:2]
+    x0=max(0,min(x for x,y,w,h in rects)-pad); y0=max(0,min(y for x,y,w,h in rects)-pad)
+    x1=min(W,max(x+w for x,y,w,h in rects)+pad); y1=min(H,max(y+h for x,y,w,h in rects)+pad)
+    return np.ascontiguousarray(gray[y0:y1, x0:x1])
+
+@functools.lru_cache(maxsize=2)
+def _prepared(key:str, path:str):
+    # 前処理済み画像は全OCRパスで共通なので1回だけ作る
+    return prepare(path)
+
+@functools.lru_cache(maxsize=8)
+def _cached_ocr(key:str, mode:str, path:str):
+    # 画像ハッシュ単位でメモ化し、.cache/ocr/ に保存して再実行時もOCRを省く
+    fp=os.path.join(CACHE_DIR, f"{key}_{mode}_v{PREP_VERSION}.pkl")
+    try:
+        with open(fp,"rb") as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+    gray=_prepared(key, path)
+    res=_ocr_text(gray) if mode=="text" else _ocr_data(gray)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(fp,"wb") as f:
+            pickle.dump(res, f)
+    except Exception:
+        pass
+    return res
+
 def ocr_text(path:str)->str:
-    img=cv2.imread(path); 
-    if img is None: raise SystemExit("画像が読めません: "+path)
-    h,w=img.shape[:2]
-    if max(h,w)<1600: img=cv2.resize(img,(int(w*1.6),int(h*1.6)))
-    gray=cv2.cvtColor(img,cv2.COLOR_BGR2GRAY)
-    gray=cv2.threshold(gray,0,255,cv2.THRESH_BINARY+cv2.THRESH_OTSU)[1]
-    pil=Image.fromarray(gray)
-    return pytesseract.image_to_string(pil, lang="jpn+eng")
+    return _cached_ocr(image_key(path), "text", path)
 
 def ocr_data(path:str):
-    img=cv2.imread(path)
-    H,W=img.shape[:2]
-    if max(H,W)<1600:
-        img=cv2.resize(img,(int(W*1.6),int(H*1.6)))
-    gray=cv2.cvtColor(img,cv2.COLOR_BGR2GRAY)
-    gray=cv2.threshold(gray,0,255,cv2.THRESH_BINARY+cv2.THRESH_OTSU)[1]
-    df=pytesseract.image_to_data(gray, lang="jpn+eng", output_type=Output.DATAFRAME, config="--psm 6")
-    df=df.dropna(subset=["text"])  # keep only text rows
-    df=df[df["text"].astype(str).str.strip()!=""]
-    return gray, df
-
-def extract_records(text:str, img_path:str|None=None):
-    blocks=[b.strip() for b in re.split(r"\n\s*\n",text) if b.strip()]
+    return _cached_ocr(image_key(path), "data", path)
+
+def _ocr_text(gray)->str:
+    return tess_string(Image.fromarray(gray), lang="jpn+eng")
+
+def _ocr_data(gray):
+    d=tess_data(gray, lang="jpn+eng", psm=6)
+    # 列ごとの numpy 配列で持つ。空白だけの語（ブロック/行の区切り行）は落とす
+    text=d["text"].astype(str)
+    keep=np.char.str_len(np.char.strip(text))>0
+    d={k:(text if k=="text" else v)[keep] for k,v in d.items()}
+    return gray, d
+
+def _first(d, word:str, col:str, default:int)->int:
+    # word を含む最初の語の col 値（無ければ default）
+    hit=np.flatnonzero(np.char.find(d["text"], word)>=0)
+    return int(d[col][hit[0]]) if hit.size else default
+
+def extract_records(text:str, img_path:str|None=None, data=None):
+    # data: ocr_data の結果 (gray, d)、またはそれを返す呼び出し可能オブジェクト（必要になるまで待たない）
+    def load_data():
+        if callable(data): return data()
+        return data if data is not None else ocr_data(img_path)
+
+    blocks=[b.strip() for b in _BLANK_LINES.split(text) if b.strip()]
     recs=[]
     for b in blocks:
         # ブロックにローマ字氏名がある（表の氏名欄の特徴）ことを前提にする
-        if not re.search(ROMAN_RE, b):
+        if not ROMAN_RE.search(b):
             continue
-        m=re.search(NAME_RE,b)
+        m=NAME_RE.search(b)
         if not m: 
             # ゆるめの2語漢字
-            cand=re.findall(r"[一-龥々〆ヵヶ]{1,4}[ \u3000][一-龥々〆ヵヶ]{1,4}",b)
+            cand=NAME_LOOSE_RE.findall(b)
             if not cand: continue
             name=cand[0].strip()
         else:
             name=m.group(0).strip()
 
         theme=""
-        KEYWORDS=["マーケティング","消費者","流通","統計","イノベーション","サイエンス","計量","リサーチ"]
         for line in b.splitlines():
             L=line.strip()
-            if any(k in L for k in KEYWORDS):
+            if _has_any(_find_keyword, L):
                 theme=normalize_themes(L)
                 if theme:
                     break
 
         # OCRではリンクは基本拾えない→空欄
         # 出版情報などのノイズを排除
-        NG=["書房","Journal","ジャーナル","Vol.","pp."]
-        if any(x in b for x in NG):
+        if _has_any(_find_ng, b):
             continue
         if theme:
             recs.append({
@@ -89,30 +244,36 @@ def extract_records(text:str, img_path:str|None=None):
                 "個人ページURL":"", "出典URL":SRC,
                 "取得日時":datetime.date.today().isoformat()
             })
+    if len(recs)>=EXPECTED_MIN:
+        return merge_records(recs)
     # 追加: 位置情報から列抽出（より堅牢）
     if img_path:
         try:
-            gray, df = ocr_data(img_path)
+            gray, d = load_data()
             H,W = gray.shape[:2]
+            # text（OCR 全文）は後段のフォールバックで使うので、語の配列は別名で持つ
+            left, top, words = d["left"], d["top"], d["text"]
             # 列境界の推定
-            spec = df[df["text"].astype(str).str.contains("専門分野", na=False)]
-            works = df[df["text"].astype(str).str.contains("主要著作", na=False)]
-            x_spec = int(spec.iloc[0].left) if not spec.empty else int(W*0.35)
-            x_works = int(works.iloc[0].left) if not works.empty else int(W*0.62)
+            x_spec = _first(d, "専門分野", "left", int(W*0.35))
+            x_works = _first(d, "主要著作", "left", int(W*0.62))
 
             # 名前候補: ローマ字行の直上にある漢字2語を優先
+            # 行ごとの連結テキストと上下端: (block,par,line) で安定ソートし、境界ごとに reduceat
+            m=(left+d["width"])<=x_spec-10
+            order=np.lexsort((d["line_num"][m], d["par_num"][m], d["block_num"][m]))
+            keys=np.stack([d[k][m][order] for k in ("block_num","par_num","line_num")])
+            starts=np.flatnonzero(np.r_[True, (keys[:,1:]!=keys[:,:-1]).any(axis=0)]) if order.size else np.array([],dtype=int)
             lines=[]
-            for (b,p,l), g in df.groupby(["block_num","par_num","line_num"]):
-                g2=g[(g.left+g.width)<=x_spec-10]
-                if g2.empty:
-                    continue
-                text=" ".join(map(str, g2.text.tolist()))
-                ymid=int((g2.top.min()+ (g2.top+g2.height).max())/2)
-                lines.append({"text":text, "ymid":ymid})
+            if starts.size:
+                tops=np.minimum.reduceat(top[m][order], starts)
+                bots=np.maximum.reduceat((top+d["height"])[m][order], starts)
+                for ws,y0,y1 in zip(np.split(words[m][order], starts[1:]), tops.tolist(), bots.tolist()):
+                    lines.append({"text":" ".join(ws.tolist()), "ymid":int((y0+y1)/2)})
+            roman=[bool(_LATIN.search(ln["text"])) for ln in lines]
 
             name_lines=[]
             for idx, ln in enumerate(lines):
-                if re.search(r"[A-Za-z]", ln["text"]):
+                if roman[idx]:
                     # 探索窓: 直上60px以内
                     cand=[x for x in lines[max(0,idx-3):idx] if (ln["ymid"]-x["ymid"])<=80]
                     cand=list(reversed(cand))
@@ -120,7 +281,7 @@ def extract_records(text:str, img_path:str|None=None):
                     for c in cand:
                         if "教授" in c["text"] or "准教授" in c["text"]:
                             continue
-                        m=re.search(NAME_RE, c["text"]) 
+                        m=NAME_RE.search(c["text"])
                         if m:
                             name=m.group(0).strip(); break
                     if name:
@@ -131,9 +292,8 @@ def extract_records(text:str, img_path:str|None=None):
             for i,ln in enumerate(name_lines):
                 y0 = name_lines[i-1]["ymid"] if i>0 else max(0, ln["ymid"]-40)
                 y1 = name_lines[i+1]["ymid"] if i+1<len(name_lines) else H
-                g = df[(df.top>=y0)&(df.top<=y1)&(df.left>=x_spec)&(df.left<=x_works-5)]
-                words=[t for t in g.text.tolist() if isinstance(t,str) and t.strip()]
-                theme=normalize_themes(" ".join(words))
+                band=words[(top>=y0)&(top<=y1)&(left>=x_spec)&(left<=x_works-5)].tolist()
+                theme=normalize_themes(" ".join(band))
                 recs.append({
                     "大学名":UNIV,"研究科":GRAD,"専攻名":MAJOR,
                     "氏名（漢字）":ln["name"],
@@ -152,31 +312,22 @@ def extract_records(text:str, img_path:str|None=None):
             else:
                 tail=text
             lines=[ln.strip() for ln in tail.splitlines() if ln.strip()]
-            titles={"教授","准教授","特任教授","助教","担当者"}
             dbg=[]
-            i=0
-            while i<len(lines):
-                if any(t in lines[i] for t in titles) and i+1<len(lines):
-                    nm=lines[i+1]
-                    m=re.search(NAME_RE, nm)
-                    if m:
-                        name=m.group(0).strip()
-                        recs.append({
-                            "大学名":UNIV,"研究科":GRAD,"専攻名":MAJOR,
-                            "氏名（漢字）":name,
-                            "研究テーマ（スラッシュ区切り）":"",
-                            "個人ページURL":"", "出典URL":SRC,
-                            "取得日時":datetime.date.today().isoformat()
-                        })
-                        dbg.append(name)
-                        i+=2
-                        continue
-                i+=1
+            for m in TITLE_NAME_RE.finditer("\n".join(lines)):
+                name=m.group("name").strip()
+                recs.append({
+                    "大学名":UNIV,"研究科":GRAD,"専攻名":MAJOR,
+                    "氏名（漢字）":name,
+                    "研究テーマ（スラッシュ区切り）":"",
+                    "個人ページURL":"", "出典URL":SRC,
+                    "取得日時":datetime.date.today().isoformat()
+                })
+                dbg.append(name)
             # ローマ字2行の直前にある漢字行も拾う
             for j in range(2, len(lines)):
-                if re.fullmatch(r"[A-Za-z\-]{2,}", lines[j-1]) and re.fullmatch(r"[A-Za-z\-]{2,}", lines[j]):
+                if _ROMAN_WORD.fullmatch(lines[j-1]) and _ROMAN_WORD.fullmatch(lines[j]):
                     cand=lines[j-2]
-                    kan=re.sub(r"[^一-龥々〆ヵヶ]", "", cand)
+                    kan=_NON_KANJI.sub("", cand)
                     if 3 <= len(kan) <= 6:
                         nm=kan[:2]+" "+kan[2:]
                         if not any(r["氏名（漢字）"]==nm for r in recs):
@@ -200,22 +351,19 @@ def extract_records(text:str, img_path:str|None=None):
     # さらにフォールバック: 氏名欄だけを切り出して名前を列挙（テーマは空欄）
     if not recs and img_path:
         try:
-            gray, df = ocr_data(img_path)
+            gray, d = load_data()
             H,W = gray.shape[:2]
-            th = df[df["text"].astype(str).str.contains("専門分野", na=False)]
-            sec = df[df["text"].astype(str).str.contains("教員紹介", na=False)]
-            namehdr = df[df["text"].astype(str).str.contains("担当者", na=False)]
-            x_theme = int(th.iloc[0].left) if not th.empty else int(W*0.35)
-            x_left  = int(namehdr.iloc[0].left) - 10 if not namehdr.empty else int(W*0.18)
-            y_top   = int(sec.iloc[0].top) if not sec.empty else 0
+            x_theme = _first(d, "専門分野", "left", int(W*0.35))
+            x_left  = _first(d, "担当者", "left", int(W*0.18)+10) - 10
+            y_top   = _first(d, "教員紹介", "top", 0)
             crop = gray[y_top:H, max(0,x_left):max(0,x_theme-10)]
-            txt = pytesseract.image_to_string(crop, lang="jpn", config="--psm 6")
+            txt = tess_string(crop, lang="jpn", psm=6)
             names=set()
             # スペースあり
-            for m in re.findall(NAME_RE, txt):
+            for m in NAME_RE.findall(txt):
                 names.add(m)
             # スペースなし（4-6連続漢字）
-            for m in re.findall(r"[一-龥々〆ヵヶ]{4,6}", txt):
+            for m in KANJI_RUN_RE.findall(txt):
                 # 2文字+残りで分割
                 nm=m[:2]+" "+m[2:]
                 names.add(nm)
@@ -230,26 +378,47 @@ def extract_records(text:str, img_path:str|None=None):
         except Exception:
             pass
 
-    # 重複名をマージ（テーマ結合）
-    merged={}
+    return merge_records(recs)
+
+def merge_records(recs:list[dict])->list[dict]:
+    # 重複名をマージ（テーマ結合）: テーマは要素単位の list+set で持ち、最後に1回だけ join
+    merged={}; themes={}
     for r in recs:
         k=r["氏名（漢字）"]
-        if k not in merged: merged[k]=r
-        else:
-            a=merged[k]["研究テーマ（スラッシュ区切り）"]; b=r["研究テーマ（スラッシュ区切り）"]
-            if b and b not in a:
-                merged[k]["研究テーマ（スラッシュ区切り）"]=" / ".join([x for x in [a,b] if x])
+        if k not in merged:
+            merged[k]=r; themes[k]=([],set())
+        uniq,seen=themes[k]
+        for p in r["研究テーマ（スラッシュ区切り）"].split("/"):
+            p=p.strip()
+            if p and p not in seen:
+                seen.add(p); uniq.append(p)
+    for k,r in merged.items():
+        r["研究テーマ（スラッシュ区切り）"]=" / ".join(themes[k][0])
     return list(merged.values())
 
 def main(img_path:str):
-    text=ocr_text(img_path)
-    # debug dump
+    # ワーカー内の SystemExit は結果待ちを止めてしまうので、読めない画像はここで弾く
+    if not cv2.haveImageReader(img_path): raise SystemExit("画像が読めません: "+img_path)
     try:
-        with open("ocr_debug.txt","w",encoding="utf-8") as df:
-            df.write(text)
-    except Exception:
-        pass
-    recs=extract_records(text, img_path)
+        key=image_key(img_path)
+        # 前処理は親で1回だけ行い、fork した子プロセスはキャッシュ済みの gray を使う
+        _prepared(key, img_path)
+        # 全文OCRと位置付きOCRは独立なので別プロセスで同時に走らせる
+        with multiprocessing.Pool(2) as pool:
+            r_text=pool.apply_async(_cached_ocr,(key,"text",img_path))
+            r_data=pool.apply_async(_cached_ocr,(key,"data",img_path))
+            text=r_text.get()
+            # debug dump
+            try:
+                with open("ocr_debug.txt","w",encoding="utf-8") as df:
+                    df.write(text)
+            except Exception:
+                pass
+            # 位置付きOCRは必要になった時だけ待つ。不要なら with を抜けた時点でワーカーごと打ち切る
+            recs=extract_records(text, img_path, r_data.get)
+    finally:
+        if HAVE_TESSEROCR:
+            close_apis()
     cols=["大学名","研究科","専攻名","氏名（漢字）","研究テーマ（スラッシュ区切り）","個人ページURL","出典URL","取得日時"]
     with open(OUT,"w",newline="",encoding="utf-8") as f:
         w=csv.DictWriter(f,fieldnames=cols); w.writeheader(); w.writerows(recs)
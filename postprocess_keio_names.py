@@ -5,7 +5,9 @@ MAJOR="商業学分野 Commercial science (Marketing)"
 SRC="https://www.fbc.keio.ac.jp/graduate/shougyou.html"
 OUT="keio_marketing_ocr.csv"
 
-NAME_RE=r"[一-龥々〆ヵヶ]{1,4}[ \u3000]+[一-龥々〆ヵヶ]{1,4}"
+NAME_RE=re.compile(r"[一-龥々〆ヵヶ]{1,4}[ \u3000]+[一-龥々〆ヵヶ]{1,4}")
+ROMAN_WORD_RE=re.compile(r"[A-Za-z\-]{2,}")
+NON_KANJI_RE=re.compile(r"[^一-龥々〆ヵヶ]")
 
 text=open("ocr_debug.txt","r",encoding="utf-8").read()
 tail=text.split("教員紹介",1)[1] if "教員紹介" in text else text
@@ -17,16 +19,16 @@ i=0
 while i<len(lines):
     if any(t in lines[i] for t in titles) and i+1<len(lines):
         nm=lines[i+1]
-        m=re.search(NAME_RE, nm)
+        m=NAME_RE.search(nm)
         if m:
             names.append(m.group(0).strip()); i+=2; continue
     i+=1
 
 # romanization pair backfill
 for j in range(2,len(lines)):
-    if re.fullmatch(r"[A-Za-z\-]{2,}", lines[j-1]) and re.fullmatch(r"[A-Za-z\-]{2,}", lines[j]):
+    if ROMAN_WORD_RE.fullmatch(lines[j-1]) and ROMAN_WORD_RE.fullmatch(lines[j]):
         cand=lines[j-2]
-        kan=re.sub(r"[^一-龥々〆ヵヶ]", "", cand)
+        kan=NON_KANJI_RE.sub("", cand)
         if 3<=len(kan)<=6:
             nm=kan[:2]+" "+kan[2:]
             if nm not in names:
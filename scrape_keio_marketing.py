@@ -1,7 +1,8 @@
 import csv, re, datetime, sys
+from itertools import islice
 from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
+from lxml import html as lhtml
 
 UNIV="慶應義塾大学"; GRAD="商学研究科"
 MAJOR="商業学分野 Commercial science (Marketing)"
@@ -9,24 +10,29 @@ SRC="https://www.fbc.keio.ac.jp/graduate/shougyou.html"
 OUT="keio_marketing_scrape.csv"
 
 NAME_RE=re.compile(r"([一-龥々〆ヵヶ]{1,4})[ \u3000]?([一-龥々〆ヵヶ]{1,4})")
+TITLE_RE=re.compile(r"(担当者|教授|准教授|特任教授|助教)")
+_BRACKETS=re.compile(r"[（）\(\)\[\]【】]")
+_SEP=re.compile(r"[、，,/／・\n\r\t]+")
+_ALNUM_ONLY=re.compile(r"^[A-Za-z0-9]+$")
+_WS=re.compile(r"\s+")
+
+# ヘッダに「担当者」「専門分野」「主要著作」を含むテーブル / 見出し「教員紹介」直後のテーブル
+TARGET_TABLE_XP="//table[.//th[contains(.,'担当者')] and .//th[contains(.,'専門分野')] and .//th[contains(.,'主要著作')]]"
+HEADING_TABLE_XP="(//*[self::h2 or self::h3 or self::h4][contains(.,'教員紹介')])[1]/following::table[1]"
 
 def normalize_themes(s:str)->str:
     # 記号除去・改行→スラッシュ / 英数字や冗長語を抑制
-    s=re.sub(r"[（）\(\)\[\]【】]"," ",s)
-    parts=re.split(r"[、，,/／・\n\r\t]+",s)
+    s=_BRACKETS.sub(" ",s)
+    parts=_SEP.split(s)
     parts=[p.strip(" 　") for p in parts if p.strip(" 　")]
     # ノイズ抑制（英数字や長すぎる要素は除外）
     cleaned=[]
     for p in parts:
         if len(p)>30: continue
-        if re.search(r"^[A-Za-z0-9]+$", p): continue
+        if _ALNUM_ONLY.search(p): continue
         cleaned.append(p)
     # 重複除去（順序保持）
-    seen=set(); uniq=[]
-    for p in cleaned:
-        if p not in seen:
-            seen.add(p); uniq.append(p)
-    return " / ".join(uniq[:12])
+    return " / ".join(islice(dict.fromkeys(cleaned), 12))
 
 def fetch_html(url:str)->str:
     r=requests.get(url, timeout=20)
@@ -34,31 +40,28 @@ def fetch_html(url:str)->str:
     r.encoding=r.apparent_encoding or r.encoding
     return r.text
 
-def find_target_table(soup:BeautifulSoup):
-    # ヘッダに「担当者」「専門分野」「主要著作」を含むテーブルを探す
-    for table in soup.find_all(["table"]):
-        headers=[(th.get_text(" ", strip=True)) for th in table.find_all("th")]
-        header_text=" ".join(headers)
-        if all(k in header_text for k in ["担当者","専門分野","主要著作"]):
-            return table
+def cell_text(el, sep:str)->str:
+    # BeautifulSoup の get_text(sep, strip=True) 相当
+    return sep.join(t.strip() for t in el.itertext() if t.strip())
+
+def find_target_table(root):
+    tables=root.xpath(TARGET_TABLE_XP)
+    if tables: return tables[0]
     # セクション見出しから近傍のテーブル
-    h = soup.find(lambda tag: tag.name in ["h2","h3","h4"] and "教員紹介" in tag.get_text())
-    if h:
-        nxt=h.find_next("table")
-        if nxt: return nxt
-    return None
+    tables=root.xpath(HEADING_TABLE_XP)
+    return tables[0] if tables else None
 
 def extract_records(table, base_url:str):
     recs=[]
-    for tr in table.find_all("tr"):
-        tds=tr.find_all(["td","th"])  # 柔軟に
+    for tr in table.xpath(".//tr"):
+        tds=tr.xpath("./td|./th")  # 柔軟に
         if len(tds)<3: 
             continue
         # 1列目: 氏名（漢字）、リンク
-        cell0_text=tds[0].get_text("\n", strip=True)
+        cell0_text=cell_text(tds[0], "\n")
         # タイトル語を除去してから氏名抽出
-        cleaned=re.sub(r"(担当者|教授|准教授|特任教授|助教)", " ", cell0_text)
-        cleaned=re.sub(r"\s+", " ", cleaned)
+        cleaned=TITLE_RE.sub(" ", cell0_text)
+        cleaned=_WS.sub(" ", cleaned)
         m=NAME_RE.search(cleaned)
         if not m:
             continue
@@ -68,12 +71,10 @@ def extract_records(table, base_url:str):
             name=f"{g1[:2]} {g1[2:]}{g2}"
         else:
             name=f"{g1} {g2}"
-        a=tds[0].find("a")
-        url=""
-        if a and a.get("href"):
-            url=urljoin(base_url, a.get("href"))
+        hrefs=tds[0].xpath("(.//a)[1]/@href")
+        url=urljoin(base_url, hrefs[0]) if hrefs and hrefs[0] else ""
         # 2列目: 専門分野
-        theme_raw=tds[1].get_text("\n", strip=True)
+        theme_raw=cell_text(tds[1], "\n")
         theme=normalize_themes(theme_raw)
         recs.append({
             "大学名":UNIV,
@@ -85,25 +86,29 @@ def extract_records(table, base_url:str):
             "出典URL":SRC,
             "取得日時":datetime.date.today().isoformat(),
         })
-    # 重複名マージ（テーマ結合）
+    # 重複名マージ（テーマ結合）: テーマは要素単位の list+set で持ち、最後に1回だけ join
     merged={}
+    themes={}
     for r in recs:
         k=r["氏名（漢字）"]
         if k not in merged:
             merged[k]=r
-        else:
-            a=merged[k]["研究テーマ（スラッシュ区切り）"]
-            b=r["研究テーマ（スラッシュ区切り）"]
-            if b and b not in a:
-                merged[k]["研究テーマ（スラッシュ区切り）"] = " / ".join([x for x in [a,b] if x])
-            if not merged[k]["個人ページURL"] and r["個人ページURL"]:
-                merged[k]["個人ページURL"]=r["個人ページURL"]
+            themes[k]=([], set())
+        elif not merged[k]["個人ページURL"] and r["個人ページURL"]:
+            merged[k]["個人ページURL"]=r["個人ページURL"]
+        uniq, seen = themes[k]
+        for p in r["研究テーマ（スラッシュ区切り）"].split("/"):
+            p=p.strip()
+            if p and p not in seen:
+                seen.add(p); uniq.append(p)
+    for k, r in merged.items():
+        r["研究テーマ（スラッシュ区切り）"]=" / ".join(themes[k][0])
     return list(merged.values())
 
 def main():
     html=fetch_html(SRC)
-    soup=BeautifulSoup(html, "lxml")
-    table=find_target_table(soup)
+    root=lhtml.fromstring(html)
+    table=find_target_table(root)
     if not table:
         print("対象テーブルが見つかりませんでした", file=sys.stderr)
         sys.exit(2)
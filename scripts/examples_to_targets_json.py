@@ -1,5 +1,9 @@
 import os, json, gspread, re, unicodedata
 from google.oauth2.service_account import Credentials
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 SHEET_ID = os.environ["SHEET_ID"]
 CREDS = Credentials.from_service_account_info(
@@ -24,7 +28,10 @@ def slugify_name_grad(univ: str, grad: str) -> str:
     s = re.sub(r"[^0-9A-Za-z\-\u3040-\u30FF\u4E00-\u9FFF]", "", s)
     return s.lower().strip("-") or "target"
 
-rows = ws.get_all_records()
+# get_all_records はヘッダ照合付きで1行ずつ dict を作るため遅い。値だけ取得して zip で組み立てる
+vals = ws.get_all_values()
+hdr = vals[0] if vals else []
+rows = [dict(zip(hdr, r)) for r in vals[1:]]
 
 items = []
 for r in rows:
@@ -86,6 +93,10 @@ for r in rows:
 
 os.makedirs("config", exist_ok=True)
 out = "config/examples_targets.json"
-with open(out, "w", encoding="utf-8") as f:
-    json.dump(items, f, ensure_ascii=False, indent=2)
+if orjson is not None:
+    with open(out, "wb") as f:
+        f.write(orjson.dumps(items, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+else:
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(items, f, ensure_ascii=False, indent=2)
 print(f"wrote {out} items={len(items)}")
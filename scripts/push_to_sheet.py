@@ -1,4 +1,4 @@
-import os, sys, json, csv, glob, gspread, os.path
+import os, sys, json, csv, glob, gspread, os.path, itertools
 from google.oauth2.service_account import Credentials
 
 SHEET_ID = os.environ["SHEET_ID"]
@@ -9,28 +9,42 @@ CREDS = Credentials.from_service_account_info(
 gc = gspread.authorize(CREDS)
 sh = gc.open_by_key(SHEET_ID)
 
+# タブ名 -> 書き込む行。最後にまとめて batchClear / batchUpdate する
+pending: dict[str, list[list[str]]] = {}
+
+def a1(tab: str) -> str:
+    return "'" + tab.replace("'", "''") + "'"
+
 def upsert(tab: str, rows: list[list[str]]):
     try:
-        ws = sh.worksheet(tab)
+        sh.worksheet(tab)
     except Exception:
-        ws = sh.add_worksheet(title=tab, rows=max(100, len(rows)+10), cols=max(20, len(rows[0]) if rows else 10))
-    ws.clear()
-    if rows:
-        ws.update("A1", rows, value_input_option="RAW")
+        sh.add_worksheet(title=tab, rows=max(100, len(rows)+10), cols=max(20, len(rows[0]) if rows else 10))
+    pending[tab] = rows
+
+def flush():
+    if not pending:
+        return
+    sh.values_batch_clear(body={"ranges": [a1(t) for t in pending]})
+    data = [{"range": f"{a1(t)}!A1", "values": rows} for t, rows in pending.items() if rows]
+    if data:
+        sh.values_batch_update(body={"valueInputOption": "RAW", "data": data})
+    pending.clear()
 
 files = sorted(glob.glob("*.csv"))
 if not files:
     print("no csv files found")
     sys.exit(0)
 
-all_rows, header = [], None
+bodies, header = [], None
 for f in files:
     with open(f, encoding="utf-8") as r:
-        rd = list(csv.reader(r))
-        if not rd:
+        # ヘッダだけ取り出して本文は1回だけリスト化（全行の中間コピーを作らない）
+        rd = csv.reader(r)
+        hdr = next(rd, None)
+        if hdr is None:
             continue
-        hdr = rd[0]
-        body = rd[1:] if len(rd) > 1 else []
+        body = list(rd)
         if header is None:
             header = hdr
 
@@ -50,9 +64,10 @@ for f in files:
             if uni or grad:
                 tab = f"{uni}-{grad}".strip("-")
 
-        upsert(tab, [hdr] + body)
-        all_rows += body
+        upsert(tab, [hdr, *body])
+        bodies.append(body)
 
 if header:
-    upsert("raw", [header] + all_rows)
+    upsert("raw", [header, *itertools.chain.from_iterable(bodies)])
+flush()
 print(f"Updated {len(files)} tabs + raw")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import argparse, os, json, sys, time
+import argparse, os, json, sys, time, hashlib
 from pathlib import Path
 
 # Ensure repository root is on sys.path so that `src` can be imported on CI
@@ -11,7 +11,9 @@ try:
 except Exception:
     pass
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 
 from google.oauth2.service_account import Credentials
 import gspread
@@ -20,6 +22,16 @@ from src.html_blockify import blockify_html, json_dumps_safe
 
 
 UA = {"User-Agent": "GradInsightBlockify/1.0 (+https://github.com/asa183/grad-insight)"}
+FETCH_WORKERS = 8
+
+# Shared keep-alive pool; fetch_html keeps its own retry loop
+SESSION = requests.Session()
+SESSION.headers.update(UA)
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Response bodies cached on disk per URL and revalidated with ETag / Last-Modified
+FETCH_CACHE_DIR = Path(os.environ.get("FETCH_CACHE_DIR", ".cache/fetch"))
 
 
 def truthy(v: str | None) -> bool:
@@ -35,13 +47,52 @@ def slugify_page(univ: str, grad: str) -> str:
     return s.lower().strip("-") or "page"
 
 
+def _cache_path(url: str) -> Path:
+    return FETCH_CACHE_DIR / (hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest() + ".json")
+
+
+def cache_load(url: str) -> Dict[str, str] | None:
+    try:
+        with open(_cache_path(url), encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def cache_store(url: str, r: requests.Response, body: str) -> None:
+    etag = r.headers.get("ETag", "")
+    last_modified = r.headers.get("Last-Modified", "")
+    if not (etag or last_modified):
+        return  # nothing to revalidate against
+    entry = {"body": body, "ctype": r.headers.get("Content-Type", ""), "etag": etag, "last_modified": last_modified}
+    try:
+        FETCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _cache_path(url)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"WARN cache write failed url={url} err={e}")
+
+
 def fetch_html(url: str, timeout: int = 10, retries: int = 2) -> tuple[str, str]:
+    cached = cache_load(url)
+    headers: Dict[str, str] = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
     last_err = None
     for i in range(retries + 1):
         try:
             t0 = time.time()
-            r = requests.get(url, headers=UA, timeout=timeout)
+            r = SESSION.get(url, timeout=timeout, headers=headers)
             elapsed_ms = int((time.time() - t0) * 1000)
+            if r.status_code == 304 and cached:
+                print(f"FETCH status=304 elapsed={elapsed_ms}ms url={url} cached")
+                return cached.get("body", ""), cached.get("ctype", "")
             ctype = r.headers.get("Content-Type", "")
             if r.status_code >= 400:
                 print(f"FETCH status={r.status_code} elapsed={elapsed_ms}ms url={url}")
@@ -51,7 +102,9 @@ def fetch_html(url: str, timeout: int = 10, retries: int = 2) -> tuple[str, str]
                 return "", ctype
             r.encoding = r.apparent_encoding or r.encoding
             print(f"FETCH status={r.status_code} elapsed={elapsed_ms}ms url={url}")
-            return r.text or "", ctype
+            body = r.text or ""
+            cache_store(url, r, body)
+            return body, ctype
         except Exception as e:
             last_err = e
     if last_err:
@@ -59,6 +112,22 @@ def fetch_html(url: str, timeout: int = 10, retries: int = 2) -> tuple[str, str]
     return "", ""
 
 
+def parse_job(url: str, html: str, max_blocks: int, golden: Dict[str, str], prefer_role: bool):
+    """Run blockify_html in a worker process and report its own elapsed time."""
+    t0 = time.time()
+    blocks = blockify_html(url, html, max_blocks=max_blocks, golden=golden, prefer_role=prefer_role)
+    return blocks, int((time.time() - t0) * 1000)
+
+
+def records(ws) -> List[Dict[str, str]]:
+    # One get_all_values call; build dict rows locally instead of get_all_records
+    vals = ws.get_all_values()
+    if not vals:
+        return []
+    hdr = vals[0]
+    return [dict(zip(hdr, r)) for r in vals[1:]]
+
+
 def ensure_worksheet(sh, title: str):
     # If exists, return; else create (with fallback suffix -2, -3 ...)
     try:
@@ -78,14 +147,23 @@ def ensure_worksheet(sh, title: str):
     raise RuntimeError(f"Failed to create worksheet for title={title}")
 
 
-def write_blocks(ws, header: List[str], rows: List[List[str]]):
+def _a1(title: str) -> str:
+    return "'" + title.replace("'", "''") + "'"
+
+
+def write_blocks(sh, pending: Dict[str, List[List[str]]]):
+    # Clear every target tab and write all pages in two API calls
+    if not pending:
+        return
     try:
-        ws.clear()
+        sh.values_batch_clear(body={"ranges": [_a1(t) for t in pending]})
     except Exception:
         pass
-    if not rows:
-        return
-    ws.update("A1", [header] + rows, value_input_option="RAW")
+    data = [{"range": f"{_a1(t)}!A1", "values": rows} for t, rows in pending.items() if len(rows) > 1]
+    if data:
+        sh.values_batch_update(body={"valueInputOption": "RAW", "data": data})
+    for t, rows in pending.items():
+        print(f"WRITE sheet=\"{t}\" rows={len(rows) - 1}")
 
 
 def run(sheet_id: str, examples_name: str, max_blocks: int):
@@ -97,7 +175,7 @@ def run(sheet_id: str, examples_name: str, max_blocks: int):
     gc = gspread.authorize(creds)
     sh = gc.open_by_key(sheet_id)
     ws_ex = sh.worksheet(examples_name)
-    rows = ws_ex.get_all_records()
+    rows = records(ws_ex)
 
     run_id = os.environ.get("GITHUB_RUN_ID") or time.strftime("%Y%m%d%H%M%S")
     sha = os.environ.get("GITHUB_SHA", "")[:7]
@@ -108,6 +186,7 @@ def run(sheet_id: str, examples_name: str, max_blocks: int):
         "block_id","tag","depth","group_id","path","has_img","text","links_json",
     ]
 
+    jobs = []
     for r in rows:
         if not truthy(r.get("有効")):
             continue
@@ -116,51 +195,66 @@ def run(sheet_id: str, examples_name: str, max_blocks: int):
         url = (r.get("研究科URL", "") or r.get("出典URL", "") or "").strip()
         if not url:
             continue
-        page_id = slugify_page(univ, grad)
-        print(f"START id={page_id} university={univ} graduate_school={grad} url={url}")
-        html, ctype = fetch_html(url)
-        if not html:
-            print(f"WARN skip: empty or non-html url={url}")
-            continue
-        t0 = time.time()
-        # Golden example fields (Examples sheet may have columns with fullwidth brackets)
-        def col(*names: str) -> str:
-            for nm in names:
-                v = r.get(nm)
-                if v:
-                    return str(v)
-            return ""
-        golden = {
-            "name": col("教授名（JP）", "教授名（JP}"),
-            "theme": col("研究テーマ（JP）", "研究テーマ（JP}"),
-            "link": col("リンク（JP）", "リンク（JP}"),
-        }
-        prefer_role = os.environ.get('PREFER_ROLE','').lower() in ('1','true','yes')
-        blocks = blockify_html(url, html, max_blocks=max_blocks, golden=golden, prefer_role=prefer_role)
-        elapsed_ms = int((time.time() - t0) * 1000)
-        print(f"PARSE blocks_total={len(blocks)} blocks_kept={len(blocks)} elapsed={elapsed_ms}ms")
-        # Sheet title
-        title = f"{univ}-{grad}-blocks".strip("-")
-        ws_out = ensure_worksheet(sh, title)
-        out_rows: List[List[str]] = []
-        for b in blocks:
-            out_rows.append([
-                run_id_full,
-                univ,
-                grad,
-                url,
-                page_id,
-                b.get("block_id",""),
-                b.get("tag",""),
-                b.get("depth",""),
-                b.get("group_id",""),
-                b.get("path",""),
-                b.get("has_img","FALSE"),
-                (b.get("text","") or "")[:45000],
-                b.get("links_json","[]"),
-            ])
-        write_blocks(ws_out, header, out_rows)
-        print(f"WRITE sheet=\"{ws_out.title}\" rows={len(out_rows)}")
+        jobs.append((r, univ, grad, url))
+
+    prefer_role = os.environ.get('PREFER_ROLE','').lower() in ('1','true','yes')
+
+    # Golden example fields (Examples sheet may have columns with fullwidth brackets)
+    def col(r: Dict[str, str], *names: str) -> str:
+        for nm in names:
+            v = r.get(nm)
+            if v:
+                return str(v)
+        return ""
+
+    # Fetch in threads and hand each page to a process pool as soon as it arrives,
+    # so parsing overlaps the remaining downloads; results are consumed in sheet order.
+    pending: Dict[str, List[List[str]]] = {}
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as fx, ProcessPoolExecutor() as px:
+        fetches = [fx.submit(fetch_html, url) for (_, _, _, url) in jobs]
+        parses = []
+        for (r, univ, grad, url), fut in zip(jobs, fetches):
+            html, ctype = fut.result()
+            if not html:
+                parses.append(None)
+                continue
+            golden = {
+                "name": col(r, "教授名（JP）", "教授名（JP}"),
+                "theme": col(r, "研究テーマ（JP）", "研究テーマ（JP}"),
+                "link": col(r, "リンク（JP）", "リンク（JP}"),
+            }
+            parses.append(px.submit(parse_job, url, html, max_blocks, golden, prefer_role))
+
+        for (r, univ, grad, url), fut in zip(jobs, parses):
+            page_id = slugify_page(univ, grad)
+            print(f"START id={page_id} university={univ} graduate_school={grad} url={url}")
+            if fut is None:
+                print(f"WARN skip: empty or non-html url={url}")
+                continue
+            blocks, elapsed_ms = fut.result()
+            print(f"PARSE blocks_total={len(blocks)} blocks_kept={len(blocks)} elapsed={elapsed_ms}ms")
+            # Sheet title
+            title = f"{univ}-{grad}-blocks".strip("-")
+            ws_out = ensure_worksheet(sh, title)
+            out_rows: List[List[str]] = []
+            for b in blocks:
+                out_rows.append([
+                    run_id_full,
+                    univ,
+                    grad,
+                    url,
+                    page_id,
+                    b.get("block_id",""),
+                    b.get("tag",""),
+                    b.get("depth",""),
+                    b.get("group_id",""),
+                    b.get("path",""),
+                    b.get("has_img","FALSE"),
+                    (b.get("text","") or "")[:45000],
+                    b.get("links_json","[]"),
+                ])
+            pending[ws_out.title] = [header] + out_rows
+    write_blocks(sh, pending)
 
 
 def main():
@@ -1,63 +1,130 @@
-import os, json, gspread
+import os, json, time, gspread
+from gspread.utils import numericise_all
 from google.oauth2.service_account import Credentials
 
 SHEET_ID = os.environ["SHEET_ID"]
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+    # modifiedTime の取得（キャッシュ判定）用
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
 CREDS = Credentials.from_service_account_info(
     json.loads(os.environ["GOOGLE_CREDENTIALS_JSON"]), scopes=SCOPES
 )
 gc = gspread.authorize(CREDS)
 sh = gc.open_by_key(SHEET_ID)
 
-def rows(tab):
+# シートのスナップショットをローカルに保存し、シートが更新されていなければ API を読まない
+CACHE_PATH = "config/.targets_cache.json"
+CACHE_TTL = int(os.environ.get("SHEET_CACHE_TTL", "3600"))  # modifiedTime が取れない時だけ使う
+
+def a1(tab):
+    return "'" + tab.replace("'", "''") + "'"
+
+def records(values):
+    # get_all_records 相当: 末尾の空セルを補い、数値文字列は数値にする
+    if not values:
+        return []
+    hdr = values[0]
+    return [dict(zip(hdr, numericise_all(r + [""] * (len(hdr) - len(r))))) for r in values[1:]]
+
+def load_tabs(*tabs):
+    # 全タブを values_batch_get の1リクエストで読む。戻り値は (タブ→行, 全タブ読めたか)
     try:
-        return sh.worksheet(tab).get_all_records()
+        res = sh.values_batch_get([a1(t) for t in tabs]).get("valueRanges", [])
+        if len(res) == len(tabs):
+            return {t: records(vr.get("values", [])) for t, vr in zip(tabs, res)}, True
     except Exception:
-        return []
+        pass
+    # タブが1つでも無いとバッチ全体が失敗するので、その時だけタブごとに読む
+    out, ok = {}, True
+    for t in tabs:
+        try:
+            out[t] = records(sh.worksheet(t).get_all_values())
+        except Exception:
+            out[t], ok = [], False
+    return out, ok
 
 def split(s):
     return [x.strip() for x in str(s).split("|") if x and x.strip()]
 
-targets_rows = rows("targets")
-pages_rows   = rows("pages")
+def last_update():
+    # Drive の modifiedTime（gspread 6: get_lastUpdateTime / 5: lastUpdateTime）
+    try:
+        f = getattr(sh, "get_lastUpdateTime", None)
+        return (f() if f else sh.lastUpdateTime) or ""
+    except Exception:
+        return ""
 
-# id -> pages[]
-pages_map = {}
-for p in pages_rows:
-    if str(p.get("enabled","TRUE")).upper() in ("FALSE","0","NO"):
-        continue
-    pid = p["id"]
-    pages_map.setdefault(pid, []).append({
+def cached_tabs(*tabs):
+    mt = last_update()
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as f:
+            c = json.load(f)
+        fresh = (c.get("modifiedTime") == mt) if mt else (time.time() - c.get("saved_at", 0) < CACHE_TTL)
+        if fresh and c.get("sheet_id") == SHEET_ID and all(t in c.get("tabs", {}) for t in tabs):
+            print(f"sheet cache hit modifiedTime={mt or '-'}")
+            return {t: c["tabs"][t] for t in tabs}
+    except Exception:
+        pass
+    data, ok = load_tabs(*tabs)
+    # 読み込み失敗や全タブ空（API 障害など）の結果はキャッシュしない。次回また API を読む
+    if not ok or not any(data.values()):
+        return data
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp = CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"sheet_id": SHEET_ID, "modifiedTime": mt, "saved_at": time.time(), "tabs": data}, f, ensure_ascii=False)
+        os.replace(tmp, CACHE_PATH)
+    except Exception:
+        pass
+    return data
+
+tabs = cached_tabs("targets", "pages")
+targets_rows = tabs["targets"]
+pages_rows   = tabs["pages"]
+
+FALSY = frozenset(("FALSE", "0", "NO"))
+TRUTHY = frozenset(("1", "true", "yes"))
+DEFAULT_THEME_SPLIT = r"[、，,/／・\n]+"
+
+def enabled(r):
+    return str(r.get("enabled", "TRUE")).upper() not in FALSY
+
+def page_entry(p):
+    g = p.get
+    return {
         "url": p["url"],
-        "anchors": split(p.get("anchors","")),
-        "page_type": (p.get("page_type") or "table").lower(),
+        "anchors": split(g("anchors", "")),
+        "page_type": (g("page_type") or "table").lower(),
         "selectors": {
-            "table_selector": p.get("table_selector",""),
-            "name_cell_idx": int(p.get("name_cell_idx") or 0),
-            "theme_cell_idx": int(p.get("theme_cell_idx") or 1),
-            "card_selector": p.get("card_selector",""),
-            "name_selector": p.get("name_selector",""),
-            "theme_selector": p.get("theme_selector",""),
-            "link_selector": p.get("link_selector",""),
-            "theme_split": p.get("theme_split") or r"[、，,/／・\n]+",
+            "table_selector": g("table_selector", ""),
+            "name_cell_idx": int(g("name_cell_idx") or 0),
+            "theme_cell_idx": int(g("theme_cell_idx") or 1),
+            "card_selector": g("card_selector", ""),
+            "name_selector": g("name_selector", ""),
+            "theme_selector": g("theme_selector", ""),
+            "link_selector": g("link_selector", ""),
+            "theme_split": g("theme_split") or DEFAULT_THEME_SPLIT,
         },
-        "dynamic": str(p.get("dynamic","false")).lower() in ("1","true","yes"),
-    })
-
-items = []
-for t in targets_rows:
-    if str(t.get("enabled","TRUE")).upper() in ("FALSE","0","NO"):
-        continue
-    tid = t["id"]
-    items.append({
-        "id": tid,
-        "university": t["university"],
-        "graduate_school": t["graduate_school"],
-        "major": t["major"],
-        "expected_count_total": int(t.get("expected_count_total") or 0),
-        "pages": pages_map.get(tid, []),
-        "enabled": True,
-    })
+        "dynamic": str(g("dynamic", "false")).lower() in TRUTHY,
+    }
+
+# id -> pages[]
+pages_map = {}
+for p in filter(enabled, pages_rows):
+    pages_map.setdefault(p["id"], []).append(page_entry(p))
+
+items = [{
+    "id": t["id"],
+    "university": t["university"],
+    "graduate_school": t["graduate_school"],
+    "major": t["major"],
+    "expected_count_total": int(t.get("expected_count_total") or 0),
+    "pages": pages_map.get(t["id"], []),
+    "enabled": True,
+} for t in filter(enabled, targets_rows)]
 
 out = "config/targets_flat.json"
 os.makedirs("config", exist_ok=True)
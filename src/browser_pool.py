@@ -0,0 +1,99 @@
+from __future__ import annotations
+import atexit
+import contextlib
+import os
+import queue
+import threading
+from typing import Iterator, List
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "").strip() or default)
+    except Exception:
+        return default
+
+BROWSER_POOL_SIZE = _env_int("BROWSER_POOL_SIZE", 2)
+BROWSER_POOL_RECYCLE_AFTER = _env_int("BROWSER_POOL_RECYCLE_AFTER", 100)
+
+
+class BrowserPool:
+    """One long-lived Chromium with a fixed set of BrowserContexts handed out per page.
+
+    Contexts are re-created after ``recycle_after`` uses to keep native memory from drifting.
+    Playwright's sync API is bound to the thread that started it, so use ``get_pool()``
+    which keeps one pool per thread.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, recycle_after: int = BROWSER_POOL_RECYCLE_AFTER):
+        from playwright.sync_api import sync_playwright  # type: ignore
+        self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch()
+        self._recycle_after = max(1, recycle_after)
+        self._idle: queue.Queue = queue.Queue()
+        for _ in range(max(1, size)):
+            self._idle.put([self._browser.new_context(), 0])
+
+    def is_connected(self) -> bool:
+        with contextlib.suppress(Exception):
+            return self._browser.is_connected()
+        return False
+
+    @contextlib.contextmanager
+    def context(self) -> Iterator[object]:
+        slot = self._idle.get()
+        try:
+            if slot[0] is None:
+                # an earlier re-create failed; retry now so the caller sees the browser's error
+                slot[0], slot[1] = self._browser.new_context(), 0
+            yield slot[0]
+        finally:
+            try:
+                slot[1] += 1
+                if slot[0] is not None and (slot[1] >= self._recycle_after or not self.is_connected()):
+                    with contextlib.suppress(Exception):
+                        slot[0].close()
+                    slot[0], slot[1] = None, 0
+                    with contextlib.suppress(Exception):
+                        slot[0] = self._browser.new_context()
+            finally:
+                # a lost slot would leave _idle.get() blocking forever once all are gone
+                self._idle.put(slot)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            ctx = self._idle.get_nowait()[0]
+            if ctx is not None:
+                with contextlib.suppress(Exception):
+                    ctx.close()
+        with contextlib.suppress(Exception):
+            self._browser.close()
+        with contextlib.suppress(Exception):
+            self._pw.stop()
+
+
+_LOCAL = threading.local()
+_POOLS: List[BrowserPool] = []
+
+
+def get_pool() -> BrowserPool:
+    """Return this thread's pool, launching Chromium on first use (ImportError without Playwright).
+
+    A pool whose browser has crashed or disconnected is closed and replaced.
+    """
+    pool = getattr(_LOCAL, "pool", None)
+    if pool is not None and not pool.is_connected():
+        with contextlib.suppress(ValueError):
+            _POOLS.remove(pool)
+        pool.close()
+        pool = _LOCAL.pool = None
+    if pool is None:
+        pool = BrowserPool()
+        _LOCAL.pool = pool
+        _POOLS.append(pool)
+    return pool
+
+
+@atexit.register
+def close_all() -> None:
+    while _POOLS:
+        _POOLS.pop().close()
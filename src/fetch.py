@@ -1,28 +1,77 @@
 from __future__ import annotations
 import contextlib
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from urllib3.util.retry import Retry
 
 UA = {"User-Agent": "GradInsightBot/1.0 (+https://example.org)"}
+# 軽いノイズ除去（Word由来など）: 1回の走査でまとめて消す
+_NOISE_RE = re.compile(r"MsoNormalTable|Normal 0 0")
+# 読み込む本文の上限（巨大ページや誤って拾ったバイナリでメモリを食い潰さない）
+MAX_HTML_BYTES = 8_000_000
+
+# 同一ホストへの接続を使い回す（TCP/TLS ハンドシェイクをページごとに繰り返さない）
+_SESSION = requests.Session()
+_SESSION.headers.update(UA)
+_ADAPTER = HTTPAdapter(pool_connections=50, pool_maxsize=50,
+                       max_retries=Retry(total=3, backoff_factor=0.3))
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
 
 def fetch_html(url: str, timeout: int = 30) -> str:
-    r = requests.get(url, headers=UA, timeout=timeout)
-    r.raise_for_status()
-    r.encoding = r.apparent_encoding or r.encoding
-    # 軽いノイズ除去（Word由来など）
-    return r.text.replace("MsoNormalTable", "").replace("Normal 0 0", "")
+    with _SESSION.get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        chunks = []
+        total = 0
+        for c in r.iter_content(65536):
+            chunks.append(c)
+            total += len(c)
+            if total >= MAX_HTML_BYTES:
+                break
+        raw = b"".join(chunks)[:MAX_HTML_BYTES]
+        # r.apparent_encoding は r.content を読むため、切り詰めた本文で同じ判定をする
+        enc = (chardet.detect(raw) or {}).get("encoding") or r.encoding or "utf-8"
+        try:
+            html = raw.decode(enc, errors="replace")
+        except LookupError:
+            html = raw.decode("utf-8", errors="replace")
+        return _NOISE_RE.sub("", html)
+
+def fetch_many(urls: Iterable[str], max_workers: int = 8) -> Dict[str, str]:
+    # 共有 Session（接続プール）の上で複数URLを並列取得する。
+    # 失敗したURLは結果に含めない（呼び出し側は fetch_html で取り直せば元の例外がそのまま出る）
+    uniq = list(dict.fromkeys(u for u in urls if u))
+    out: Dict[str, str] = {}
+    if not uniq:
+        return out
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(uniq)))) as ex:
+        futs = {ex.submit(fetch_html, u): u for u in uniq}
+        for f in as_completed(futs):
+            try:
+                out[futs[f]] = f.result()
+            except Exception:
+                pass
+    return out
 
-def fetch_dynamic_html(url: str, wait_ms: int = 1500) -> str:
+def fetch_dynamic_html(url: str, wait_ms: int = 1500, wait_selector: Optional[str] = None) -> str:
     # Playwright が無い場合は通常fetchにフォールバック
     with contextlib.suppress(ImportError):
-        from playwright.sync_api import sync_playwright  # type: ignore
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
-            page.goto(url, wait_until="networkidle")
-            if wait_ms:
-                time.sleep(wait_ms / 1000)
-            html = page.content()
-            browser.close()
-            return html
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError  # type: ignore
+        from .browser_pool import get_pool
+        # 常駐ブラウザの BrowserContext を借りてページだけ開閉する（毎回の Chromium 起動を省く）
+        with get_pool().context() as ctx:
+            page = ctx.new_page()
+            try:
+                page.goto(url, wait_until="networkidle")
+                # 固定 sleep はせず、アンカーが分かっていればその出現だけ待つ（間に合わなければ現状の DOM を返す）
+                if wait_selector:
+                    with contextlib.suppress(PlaywrightTimeoutError):
+                        page.wait_for_selector(wait_selector, timeout=wait_ms)
+                return page.content()
+            finally:
+                page.close()
     return fetch_html(url)
@@ -1,18 +1,32 @@
 from __future__ import annotations
-import re, os
-from typing import List, Dict, Tuple, Optional
-from urllib.parse import urljoin, urlparse
+import heapq, re, os, json, sys
+from collections import Counter
+from typing import Callable, List, Dict, Tuple, Optional
+from urllib.parse import urljoin, urlsplit
+
+# selectolax (Lexbor backend) is a hard dependency: one implementation for parse and traversal
+from selectolax.lexbor import LexborHTMLParser as HTMLParser, LexborNode as Node
 
 try:
-    from selectolax.parser import HTMLParser, Node
-    HAVE_SELECTOLAX = True
+    import orjson  # type: ignore
 except Exception:
-    HAVE_SELECTOLAX = False
-    from bs4 import BeautifulSoup  # type: ignore
-
-
-REMOVALS = {"script", "style", "noscript", "svg", "canvas", "nav", "aside", "footer", "header"}
-BLOCK_TAGS = {"div", "section", "article", "li", "td"}
+    orjson = None
+
+# serializer picked once at import instead of per call
+if orjson is not None:
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+REMOVALS = ("script", "style", "noscript", "svg", "canvas", "nav", "aside", "footer", "header")
+# tuple (not set) so the combined selector string is stable across runs
+BLOCK_TAGS = ("div", "section", "article", "li", "td")
+# one combined query each (a single C-level walk beats a Python traverse() with a tag test)
+_REMOVALS_SEL = ",".join(REMOVALS)
+_BLOCK_SEL = ",".join(BLOCK_TAGS)
 ROLE_KEYWORDS = [
     # Japanese titles
     "教授","准教授","助教","講師","特任教授","客員教授","名誉教授","非常勤講師","招聘教授","招へい教員",
@@ -26,169 +40,284 @@ TEXT_MIN = 10
 TEXT_MAX = 30000  # keep below Google Sheets cell limits
 ASCEND_MAX = 8
 
+_RE_WS = re.compile(r"\s+")
+_RE_SLUG1 = re.compile(r"[\u3000\s]+")
+_RE_SLUG2 = re.compile(r"[^0-9A-Za-z\-\u3040-\u30FF\u4E00-\u9FFF]")
+# URLs that urljoin would hand back verbatim once resolved: no whitespace/params, no empty ?/#
+_RE_URL_AUTHORITY = re.compile(r"(https?:)?//[^/?#]")
+_RE_PLAIN_URL = re.compile(r"[\w\-~%/:@!$&'()*+,=.]*(?:\?[\w\-~%/:@!$&'()*+,=.?]+)?(?:#[\w\-~%/:@!$&'()*+,=.?#]+)?\Z")
+
 
 def _normalize_ws(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _RE_WS.sub(" ", (s or "").strip())
 
 
 PERSONAL_LINK_PATTERNS = (
     "/faculty-member/", "/faculty/", "/people/", "/person/", "/profiles/", "/profile",
     "/researcher", "/researchers/", "/staff/", "/r/lab/",
 )
+# narrower set used when climbing from golden seeds
+GOLDEN_PERSONAL_PATTERNS = (
+    "/faculty-member/", "/faculty/", "/people/", "/person/", "/profile", "/researcher", "/staff/",
+)
+_PERSONAL_RE = re.compile("|".join(map(re.escape, PERSONAL_LINK_PATTERNS)))
+_GOLDEN_PERSONAL_RE = re.compile("|".join(map(re.escape, GOLDEN_PERSONAL_PATTERNS)))
+_ROLE_RE = re.compile("|".join(map(re.escape, ROLE_KEYWORDS)))
+_MIN_ROLE_LEN = min(map(len, ROLE_KEYWORDS))
 
 
 def _looks_personal_href(href: str) -> bool:
-    h = href or ""
-    return any(p in h for p in PERSONAL_LINK_PATTERNS)
+    return bool(href) and _PERSONAL_RE.search(href) is not None
 
 
 def _slugify(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"[\u3000\s]+", "-", s)
-    s = re.sub(r"[^0-9A-Za-z\-\u3040-\u30FF\u4E00-\u9FFF]", "", s)
+    s = _RE_SLUG1.sub("-", s)
+    s = _RE_SLUG2.sub("", s)
     return s.lower().strip("-") or "page"
 
 
-def _text_with_breaks_sel(node: "Node") -> str:
-    # Minimal: rely on selectolax text extraction
-    try:
-        s = node.text() or ""
-        return s.strip()
-    except Exception:
-        return ""
-
-
 def _iter_children_sel(n: "Node"):
-    try:
-        c = n.child
-        while c is not None:
-            yield c
-            c = c.next
-    except Exception:
-        return
+    # Node.iter walks the child list in C; include_text keeps text/comment nodes like .child/.next did
+    yield from n.iter(include_text=True)
 
 
-def _nth_index_in_parent(n: "Node") -> int:
-    p = getattr(n, "parent", None)
-    if not p:
-        return 1
-    idx = 1
+def _fill_nth_indices(p: "Node", nth: Dict[int, int]) -> None:
+    # one pass over p's children records every child's nth-of-type index (keyed by mem_id)
+    counts: Dict[str, int] = {}
     for c in _iter_children_sel(p):
-        if c is n:
-            return idx
-        if getattr(c, "tag", None) == getattr(n, "tag", None):
-            idx += 1
-    return idx
-
-
-def _css_path(n: "Node", max_depth: int = 8) -> str:
-    parts: List[str] = []
+        t = c.tag
+        counts[t] = counts.get(t, 0) + 1
+        nth[c.mem_id] = counts[t]
+
+
+def _css_path(n: "Node", max_depth: int = 8, nth: Optional[Dict[int, int]] = None,
+              segs: Optional[Dict[int, Tuple[str, ...]]] = None) -> str:
+    # pass shared `nth` / `segs` dicts to reuse sibling scans and ancestor paths across calls
+    # on the same tree: siblings then stop climbing at their parent's cached segments
+    if nth is None:
+        nth = {}
+    if segs is None:
+        segs = {}
+    chain: List[Tuple[int, str]] = []
+    base: Tuple[str, ...] = ()
     cur: Optional[Node] = n
-    depth = 0
-    while cur is not None and depth < max_depth:
-        if not getattr(cur, "tag", None):
+    while cur is not None:
+        k = cur.mem_id
+        hit = segs.get(k)
+        if hit is not None:
+            base = hit
             break
         tag = cur.tag
-        idx = _nth_index_in_parent(cur)
-        parts.append(f"{tag}:nth-of-type({idx})")
-        cur = cur.parent
-        depth += 1
-    parts.reverse()
-    return ">".join(parts)
+        # stop at the document node ("-undef" / "#document" / "-document" depending on backend)
+        if not tag or tag[0] in "-#":
+            break
+        p = cur.parent
+        idx = nth.get(k)
+        if idx is None:
+            if p is not None:
+                _fill_nth_indices(p, nth)
+            idx = nth.get(k, 1)
+        chain.append((k, tag + ":nth-of-type(" + str(idx) + ")"))
+        cur = p
+    # segments per node are the last max_depth levels of its ancestry
+    for k, seg in reversed(chain):
+        base = (base + (seg,))[-max_depth:]
+        segs[k] = base
+    return ">".join(base)
 
 
-def _child_signature(n: "Node") -> str:
-    counts: Dict[str, int] = {}
-    for c in _iter_children_sel(n):
-        tag = getattr(c, "tag", None)
-        if not tag:
-            continue
-        counts[tag] = counts.get(tag, 0) + 1
-    items = sorted(counts.items())
-    return ";".join(f"{k}:{v}" for k, v in items)
+_UPPER_TAGS: Dict[str, str] = {}
+
+
+def _upper_tag(tag: str) -> str:
+    # one shared "DIV"/"LI"/... per tag name instead of a fresh .upper() string per row
+    r = _UPPER_TAGS.get(tag)
+    if r is None:
+        r = _UPPER_TAGS[tag] = sys.intern(tag.upper())
+    return r
+
+
+def _child_signature(n: "Node") -> Tuple[Tuple[str, int], ...]:
+    # selectolax returns a fresh str per .tag access; interning lets signature keys compare by identity
+    return tuple(sorted((sys.intern(k), v) for k, v in Counter(c.tag for c in _iter_children_sel(n) if c.tag).items()))
+
+
+def _group_id(key: Tuple[str, str, Tuple[Tuple[str, int], ...]]) -> str:
+    parent_tag, tag, sig = key
+    return f"{parent_tag}|{tag}|" + ";".join(f"{k}:{v}" for k, v in sig)
 
 
 def _make_absolute(node: Node, base_url: str):
+    b = urlsplit(base_url)
+    web = b.scheme in ("http", "https") and bool(b.netloc)
+    root = f"{b.scheme}://{b.netloc}"
+    def absolute(u: str) -> str:
+        # fast paths for the common shapes; anything with dot segments or odd syntax goes to urljoin
+        if web and "/." not in u and _RE_PLAIN_URL.match(u):
+            m = _RE_URL_AUTHORITY.match(u)
+            if m:
+                return u if m.group(1) else f"{b.scheme}:{u}"
+            if u[:1] == "/" and u[1:2] != "/":
+                return root + u
+        if u.startswith(("mailto:", "tel:", "javascript:")):
+            return u
+        return urljoin(base_url, u)
     try:
-        for a in node.css("a"):
-            href = a.attributes.get("href")
-            if href:
-                a.attributes["href"] = urljoin(base_url, href)
-        for im in node.css("img"):
-            src = im.attributes.get("src")
-            if src:
-                im.attributes["src"] = urljoin(base_url, src)
+        for el in node.css("a[href], img[src]"):
+            attr = "href" if el.tag == "a" else "src"
+            v = el.attributes.get(attr)
+            if v:
+                av = absolute(v)
+                if av != v:
+                    # .attributes is a read-only snapshot; .attrs writes through to the tree
+                    el.attrs[attr] = av
     except Exception:
         pass
 
 
 def _remove_unwanted(root: Node):
-    for sel in REMOVALS:
+    # one query for all unwanted tags; remove() (unlink) rather than decompose() because
+    # matches can be nested (nav inside header) and decompose would free them twice
+    try:
+        found = root.css(_REMOVALS_SEL)
+    except Exception:
+        return
+    for n in found:
         try:
-            for n in list(root.css(sel)):
-                try:
-                    n.remove()
-                except Exception:
-                    pass
+            n.remove()
         except Exception:
-            continue
-    
+            pass
+
 
 def _has_role_text(text: str) -> bool:
-    t = text or ""
-    return any(k in t for k in ROLE_KEYWORDS)
+    if not text or len(text) < _MIN_ROLE_LEN:
+        return False
+    return _ROLE_RE.search(text) is not None
+
+
+def _node_depth(n: "Node", cache: Dict[int, int]) -> int:
+    """Number of nodes from n up to the document; siblings share their parent's climb via `cache`."""
+    chain: List[int] = []
+    cur = n
+    d = 0
+    while cur is not None:
+        hit = cache.get(cur.mem_id)
+        if hit is not None:
+            d = hit
+            break
+        chain.append(cur.mem_id)
+        cur = cur.parent
+    for k in reversed(chain):
+        d += 1
+        cache[k] = d
+    return d
+
+
+def _collect(n: "Node", cache: Dict[int, Tuple[List[Node], bool]]) -> Tuple[List[Node], bool]:
+    """Anchors and img presence for n's subtree in one walk, memoized by mem_id in `cache`."""
+    k = n.mem_id
+    r = cache.get(k)
+    if r is None:
+        anchors: List[Node] = []
+        has_img = False
+        try:
+            # traverse() is document order and includes n itself, same as n.css("a")
+            for d in n.traverse():
+                tag = d.tag
+                if tag == "a":
+                    anchors.append(d)
+                elif tag == "img":
+                    has_img = True
+        except Exception:
+            pass
+        r = cache[k] = (anchors, has_img)
+    return r
+
+
+class _TreeCache:
+    """Per-document memo tables shared by the block extractors.
+
+    selectolax hands out a fresh wrapper on every access, so everything is keyed by mem_id.
+    """
+
+    __slots__ = ("texts", "nth", "segs", "depths", "collected")
 
+    def __init__(self) -> None:
+        self.texts: Dict[int, str] = {}
+        self.nth: Dict[int, int] = {}
+        self.segs: Dict[int, Tuple[str, ...]] = {}
+        self.depths: Dict[int, int] = {}
+        self.collected: Dict[int, Tuple[List[Node], bool]] = {}
 
-def _container_score(n: "Node") -> Tuple[int,int,int,int,int,int]:
+    def text(self, n: Node) -> str:
+        # node.text() re-materializes the whole subtree each call
+        k = n.mem_id
+        r = self.texts.get(k)
+        if r is None:
+            try:
+                r = n.text() or ""
+            except Exception:
+                r = ""
+            self.texts[k] = r
+        return r
+
+    def anchors(self, n: Node) -> List[Node]:
+        return _collect(n, self.collected)[0]
+
+    def has_img(self, n: Node) -> bool:
+        return _collect(n, self.collected)[1]
+
+    def depth(self, n: Node) -> int:
+        return _node_depth(n, self.depths)
+
+    def path(self, n: Node) -> str:
+        return _css_path(n, nth=self.nth, segs=self.segs)
+
+
+def _container_score(n: "Node", t: str, collected: Dict[int, Tuple[List[Node], bool]]) -> Tuple[int,int,int,int,int,int]:
     """Score container: higher is better (role, personal link, img, length in range, tag priority)."""
-    try:
-        t = n.text() or ""
-    except Exception:
-        t = ""
+    anchors, has_img = _collect(n, collected)
     s_role = 1 if _has_role_text(t) else 0
     s_plink = 0
-    try:
-        for a in n.css('a'):
-            if _looks_personal_href(a.attributes.get('href') or ''):
-                s_plink = 1; break
-    except Exception:
-        pass
-    s_img = 0
-    try:
-        s_img = 1 if any(True for _ in n.css('img')) else 0
-    except Exception:
-        s_img = 0
+    for a in anchors:
+        if _looks_personal_href(a.attributes.get('href') or ''):
+            s_plink = 1; break
+    s_img = 1 if has_img else 0
     tl = len(_normalize_ws(t))
     s_len = 1 if (40 <= tl <= 5000) else 0
-    tag = getattr(n, 'tag', '') or ''
+    tag = n.tag or ''
     tag_pri = {'li':4,'article':3,'section':2,'div':1,'dd':3}.get(tag,0)
     return (s_role, s_plink, s_img, s_len, tag_pri, tl)
 
 
-def _unique_key_for(n: "Node") -> str:
+def _unique_key_for(n: "Node", cache: _TreeCache) -> str:
     # Prefer first personal link, else css path
-    try:
-        for a in n.css('a'):
-            href = a.attributes.get('href') or ''
-            if _looks_personal_href(href):
-                return href
-    except Exception:
-        pass
-    return _css_path(n)
+    for a in cache.anchors(n):
+        href = a.attributes.get('href') or ''
+        if _looks_personal_href(href):
+            return href
+    return cache.path(n)
 
 
-def _role_first_blocks(url: str, root: "Node", max_blocks: int) -> List[Dict[str,str]]:
+def _role_first_blocks(url: str, root: "Node", max_blocks: int, cache: Optional["_TreeCache"] = None) -> List[Dict[str,str]]:
     seeds: List["Node"] = []
+    if cache is None:
+        cache = _TreeCache()
+    _t = cache.text
+    scores: Dict[int, Tuple[int,int,int,int,int,int]] = {}
+    def score(n: "Node") -> Tuple[int,int,int,int,int,int]:
+        k = n.mem_id
+        sc = scores.get(k)
+        if sc is None:
+            sc = scores[k] = _container_score(n, _t(n), cache.collected)
+        return sc
     # collect candidates from common tags with text
     try:
         for sel in ('li','article','section','div','p','h1','h2','h3','h4','h5','h6'):
             for n in root.css(sel):
-                try:
-                    t = n.text() or ''
-                    if _has_role_text(t):
-                        seeds.append(n)
-                except Exception:
-                    continue
+                if _has_role_text(_t(n)):
+                    seeds.append(n)
     except Exception:
         pass
     seen: set[str] = set()
@@ -196,66 +325,52 @@ def _role_first_blocks(url: str, root: "Node", max_blocks: int) -> List[Dict[str
     for s in seeds:
         # ascend to best container
         best = s
-        best_sc = _container_score(s)
+        best_sc = score(s)
         steps = 0
-        p = getattr(s, 'parent', None)
+        p = s.parent
         while p is not None and steps < ASCEND_MAX:
-            sc = _container_score(p)
+            sc = score(p)
             if sc > best_sc:
                 best, best_sc = p, sc
-            p = getattr(p, 'parent', None)
+            p = p.parent
             steps += 1
         # Ensure reasonable length; if too short, expand with siblings
-        try:
-            txt = _normalize_ws(best.text() or '')
-        except Exception:
-            txt = ''
+        txt = _normalize_ws(_t(best))
         if len(txt) < 40:
             # try include previous/next sibling
-            for sib_dir in ('prev','next'):
-                sib = getattr(best, sib_dir, None)
+            for sib in (best.prev, best.next):
                 try:
                     if sib is not None:
-                        txt2 = _normalize_ws((best.text() or '') + ' ' + (sib.text() or ''))
+                        txt2 = _normalize_ws(_t(best) + ' ' + _t(sib))
                         if len(txt2) >= 40:
                             best = best  # keep as-is; text will include siblings via container ascent in next rounds
                             break
                 except Exception:
                     pass
-        key = _unique_key_for(best)
+        key = _unique_key_for(best, cache)
         if key in seen:
             continue
         seen.add(key)
         # Build row
-        tag = getattr(best, 'tag', '') or 'DIV'
-        depth = 0; q = best
-        while q is not None:
-            depth += 1
-            q = getattr(q, 'parent', None)
-        has_img = False
-        try:
-            has_img = any(True for _ in best.css('img'))
-        except Exception:
-            has_img = False
+        tag = best.tag or 'DIV'
+        depth = cache.depth(best)
+        anchors, has_img = _collect(best, cache.collected)
         links = []
         try:
-            for a in best.css('a'):
+            for a in anchors:
                 href = a.attributes.get('href') or ''
                 txta = _normalize_ws(a.text() or '')
                 if href:
                     links.append({"href": href, "text": txta})
         except Exception:
             pass
-        try:
-            text_v = best.text() or ''
-        except Exception:
-            text_v = ''
+        text_v = _t(best)
         rows.append({
             'block_id': str(len(rows)+1),
-            'tag': tag.upper(),
+            'tag': _upper_tag(tag),
             'depth': str(depth),
             'group_id': 'role-first',
-            'path': _css_path(best),
+            'path': cache.path(best),
             'has_img': 'TRUE' if has_img else 'FALSE',
             'text': text_v[:TEXT_MAX],
             'links_json': json_dumps_safe(links),
@@ -263,261 +378,183 @@ def _role_first_blocks(url: str, root: "Node", max_blocks: int) -> List[Dict[str
         if len(rows) >= max_blocks:
             break
     return rows
-def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[Dict[str, str]] = None, prefer_role: Optional[bool] = None) -> List[Dict[str, str]]:
-    base_url = url
-    out: List[Dict[str, str]] = []
-    if not HAVE_SELECTOLAX:
-        # Fallback with BeautifulSoup (slower, but acceptable for minimal impl)
-        from bs4 import BeautifulSoup  # type: ignore
-        from bs4.element import Tag  # type: ignore
-        soup = BeautifulSoup(html, "lxml")
-        for t in ("script","style","noscript","svg","canvas","nav","aside","footer","header"):
-            for n in soup.find_all(t):
-                n.decompose()
-        # base
-        base_tag = soup.find("base")
-        if base_tag and base_tag.get("href"):
-            base_url = urljoin(base_url, base_tag.get("href"))
-        # absolute urls
-        for a in soup.select("a[href]"):
-            a["href"] = urljoin(base_url, a.get("href", ""))
-        for im in soup.select("img[src]"):
-            im["src"] = urljoin(base_url, im.get("src", ""))
-        blocks = soup.select(",".join(BLOCK_TAGS))
-        # group by signature
-        groups: Dict[str, List[Tag]] = {}
-        for n in blocks:
-            text = n.get_text("\n", strip=True)
-            if not text:
-                continue
-            sig = f"{n.name}|{len(list(n.children))}|{','.join(sorted(c.name for c in n.find_all(recursive=False)))}"
-            groups.setdefault(sig, []).append(n)
-        # score and pick
-        def grp_has_role(ns: List[Tag]) -> bool:
-            try:
-                return any(_has_role_text(x.get_text(" ", strip=True)) for x in ns)
-            except Exception:
-                return False
-        def grp_max_text(ns: List[Tag]) -> int:
-            try:
-                return max(len(x.get_text(" ", strip=True)) for x in ns)
-            except Exception:
-                return 0
-        kept: List[Tag] = []
-        for sig, nodes in sorted(groups.items(), key=lambda kv: (-int(grp_has_role(kv[1])), -len(kv[1]), -grp_max_text(kv[1]))):
-            for nd in nodes:
-                kept.append(nd)
-                if len(kept) >= max_blocks:
-                    break
-            if len(kept) >= max_blocks:
-                break
-        # build rows
-        block_id = 0
-        for nd in kept:
-            block_id += 1
-            tag = nd.name.upper()
-            depth = len(list(nd.parents))
-            has_img = bool(nd.find("img"))
-            path = ""
-            try:
-                path = " > ".join([e.name for e in list(nd.parents)[::-1][:8]])
-            except Exception:
-                path = tag
-            links = []
-            for a in nd.select("a[href]"):
-                txt = a.get_text(" ", strip=True)
-                links.append({"href": a.get("href",""), "text": txt})
-            out.append({
-                "block_id": str(block_id),
-                "tag": tag,
-                "depth": str(depth),
-                "group_id": "",
-                "path": path,
-                "has_img": "TRUE" if has_img else "FALSE",
-                "text": nd.get_text("\n", strip=True)[:45000],
-                "links_json": json_dumps_safe(links),
-            })
-        return out
-
-    # selectolax path
-    tree = HTMLParser(html)
-    # base
-    try:
-        base_el = next((b for b in tree.css("base") if b.attributes.get("href")), None)
-        if base_el:
-            base_url = urljoin(base_url, base_el.attributes.get("href") or "")
-    except Exception:
-        pass
-
-    root = tree.body or tree
-    _remove_unwanted(root)
-    _make_absolute(root, base_url)
 
-    # Role-first extraction (structure-light): prioritize blocks anchored by role keywords
-    try:
-        pref = prefer_role if prefer_role is not None else (os.environ.get('PREFER_ROLE','').lower() in ('1','true','yes'))
-        if pref:
-            rows_rf: List[Dict[str,str]] = _role_first_blocks(url, root, max_blocks)
-            if rows_rf:
-                return rows_rf[:max_blocks]
-    except Exception:
-        pass
 
-    # Host-specific: Hokkaido fish faculty listing (per-professor blocks)
-    try:
-        pu = urlparse(url)
-        if (pu.hostname or "") == "www2.fish.hokudai.ac.jp" and "/faculty-member" in (pu.path or ""):
-            rows: List[Dict[str, str]] = []
-            bid = 0
-            # find all dd under dl.faculty-member that contain personal links
-            for dl in root.css("dl.faculty-member"):
-                # iterate children to preserve dt/dd pairing
-                prev = None
-                c = dl.child
-                while c is not None:
-                    if getattr(c, "tag", None) == "dd":
-                        # check for personal link under dd
-                        has_person_link = False
+def _fish_blocks(root: Node, max_blocks: int, cache: "_TreeCache") -> List[Dict[str, str]]:
+    """Hokkaido fish faculty listing: one block per dd under dl.faculty-member with a personal link."""
+    rows: List[Dict[str, str]] = []
+    bid = 0
+    # find all dd under dl.faculty-member that contain personal links
+    for dl in root.css("dl.faculty-member"):
+        # iterate children to preserve dt/dd pairing
+        prev = None
+        c = dl.child
+        while c is not None:
+            if c.tag == "dd":
+                # check for personal link under dd
+                has_person_link = False
+                try:
+                    for a in cache.anchors(c):
+                        href = a.attributes.get("href") or ""
+                        if "/faculty-member/" in href and not href.endswith("/faculty-member/"):
+                            has_person_link = True; break
+                except Exception:
+                    pass
+                if has_person_link:
+                    bid += 1
+                    tag = _upper_tag(c.tag)
+                    depth = cache.depth(c)
+                    # has_img: from paired dt or within dd
+                    has_img = False
+                    try:
+                        if prev is not None and prev.tag == "dt":
+                            has_img = cache.has_img(prev)
+                    except Exception:
+                        has_img = False
+                    if not has_img:
                         try:
-                            for a in c.css("a"):
-                                href = a.attributes.get("href") or ""
-                                if "/faculty-member/" in href and not href.endswith("/faculty-member/"):
-                                    has_person_link = True; break
+                            has_img = cache.has_img(c)
                         except Exception:
-                            pass
-                        if has_person_link:
-                            bid += 1
-                            tag = c.tag.upper()
-                            # depth
-                            depth = 0
-                            p = c
-                            while p is not None:
-                                depth += 1
-                                p = getattr(p, "parent", None)
-                            # has_img: from paired dt or within dd
                             has_img = False
-                            try:
-                                if prev is not None and getattr(prev, "tag", None) == "dt":
-                                    for im in prev.css("img"):
-                                        has_img = True; break
-                            except Exception:
-                                has_img = False
-                            if not has_img:
-                                try:
-                                    has_img = any(True for _ in c.css("img"))
-                                except Exception:
-                                    has_img = False
-                            path = _css_path(c)
-                            # links
-                            links = []
-                            try:
-                                for a in c.css("a"):
-                                    href = a.attributes.get("href") or ""
-                                    txt = a.text() or ""
-                                    if href:
-                                        links.append({"href": href, "text": re.sub(r"\s+", " ", txt).strip()})
-                            except Exception:
-                                pass
-                            try:
-                                text_v = _text_with_breaks_sel(c)
-                            except Exception:
-                                text_v = c.text() or ""
-                            rows.append({
-                                "block_id": str(bid),
-                                "tag": tag,
-                                "depth": str(depth),
-                                "group_id": "hokudai-fish",
-                                "path": path,
-                                "has_img": "TRUE" if has_img else "FALSE",
-                                "text": text_v[:45000],
-                                "links_json": json_dumps_safe(links),
-                            })
-                    prev = c
-                    c = getattr(c, "next", None)
-            if rows:
-                return rows[:max_blocks]
-    except Exception:
-        pass
+                    path = cache.path(c)
+                    # links
+                    links = []
+                    try:
+                        for a in cache.anchors(c):
+                            href = a.attributes.get("href") or ""
+                            txt = cache.text(a)
+                            if href:
+                                links.append({"href": href, "text": _RE_WS.sub(" ", txt).strip()})
+                    except Exception:
+                        pass
+                    text_v = cache.text(c).strip()
+                    rows.append({
+                        "block_id": str(bid),
+                        "tag": tag,
+                        "depth": str(depth),
+                        "group_id": "hokudai-fish",
+                        "path": path,
+                        "has_img": "TRUE" if has_img else "FALSE",
+                        "text": text_v[:45000],
+                        "links_json": json_dumps_safe(links),
+                    })
+            prev = c
+            c = c.next
+    return rows
 
-    # Host-specific: Hokkaido AGR faculty listing (per-professor blocks)
-    try:
-        pu = urlparse(url)
-        if (pu.hostname or "") == "www.agr.hokudai.ac.jp" and (pu.path or "").strip("/") == "r/faculty":
-            rows: List[Dict[str, str]] = []
-            bid = 0
-            seen_keys: set[str] = set()
-            # Prefer li elements that contain exactly one /r/lab/ link and a role keyword
-            def count_lab_links(n: Node) -> int:
-                try:
-                    return sum(1 for a in n.css('a') if '/r/lab/' in (a.attributes.get('href') or ''))
-                except Exception:
-                    return 0
-            # scan all li nodes (primary)
-            for li in root.css('li'):
+
+def _agr_blocks(root: Node, max_blocks: int, cache: "_TreeCache") -> List[Dict[str, str]]:
+    """Hokkaido AGR faculty listing: li rows anchored by /r/lab/ links, then role-bearing .card blocks."""
+    rows: List[Dict[str, str]] = []
+    bid = 0
+    seen_keys: set[str] = set()
+    # Prefer li elements that contain exactly one /r/lab/ link and a role keyword
+    def lab_hrefs(n: Node) -> List[str]:
+        try:
+            return [h for h in (a.attributes.get('href') or '' for a in cache.anchors(n)) if '/r/lab/' in h]
+        except Exception:
+            return []
+    # scan all li nodes (primary)
+    for li in root.css('li'):
+        try:
+            txt_li = cache.text(li)
+            tl = len(txt_li)
+            if tl < TEXT_MIN or tl > TEXT_MAX:
+                continue
+            labs = lab_hrefs(li)
+            lc = len(labs)
+            has_role = _has_role_text(txt_li)
+            # Accept if it looks like a person row:
+            # - Prefer role keyword, allow up to 5 lab links (some entries list multiple labs)
+            # - Or, if no role keyword, require exactly 1 lab link as a strong hint
+            if has_role:
+                if lc > 5:
+                    continue
+            else:
+                if lc != 1:
+                    continue
+        except Exception:
+            continue
+        # use this li as block
+        use = li
+        # unique key by first lab link when available
+        key = labs[0] if labs else None
+        path = cache.path(use)
+        key = key or path
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        bid += 1
+        tag = _upper_tag(use.tag or 'div')
+        depth = cache.depth(use)
+        # has_img
+        has_img = False
+        try:
+            has_img = cache.has_img(use)
+        except Exception:
+            has_img = False
+        # links
+        links = []
+        try:
+            for la in cache.anchors(use):
+                href = la.attributes.get('href') or ''
+                txt = cache.text(la)
+                if href:
+                    links.append({"href": href, "text": _RE_WS.sub(" ", txt).strip()})
+        except Exception:
+            pass
+        text_v = cache.text(use).strip()
+        rows.append({
+            "block_id": str(bid),
+            "tag": tag,
+            "depth": str(depth),
+            "group_id": "hokudai-agr",
+            "path": path,
+            "has_img": "TRUE" if has_img else "FALSE",
+            "text": text_v[:TEXT_MAX],
+            "links_json": json_dumps_safe(links),
+        })
+        if len(rows) >= max_blocks:
+            break
+    # Secondary: some themes use cards; include minimal .card blocks that contain role keywords
+    if len(rows) < max_blocks:
+        try:
+            for card in root.css('.card'):
                 try:
-                    txt_li = li.text() or ''
-                    tl = len(txt_li)
+                    txt = cache.text(card)
+                    if not _has_role_text(txt):
+                        continue
+                    tl = len(txt)
                     if tl < TEXT_MIN or tl > TEXT_MAX:
                         continue
-                    lc = count_lab_links(li)
-                    has_role = _has_role_text(txt_li)
-                    # Accept if it looks like a person row:
-                    # - Prefer role keyword, allow up to 5 lab links (some entries list multiple labs)
-                    # - Or, if no role keyword, require exactly 1 lab link as a strong hint
-                    if has_role:
-                        if lc > 5:
-                            continue
-                    else:
-                        if lc != 1:
-                            continue
                 except Exception:
                     continue
-                # use this li as block
-                use = li
-                # unique key by first lab link when available
-                key = None
-                try:
-                    first_lab = next((a for a in use.css('a') if '/r/lab/' in (a.attributes.get('href') or '')), None)
-                    if first_lab is not None:
-                        key = first_lab.attributes.get('href') or None
-                except Exception:
-                    key = None
-                path = _css_path(use)
-                key = key or path
-                if key in seen_keys:
+                path = cache.path(card)
+                if path in seen_keys:
                     continue
-                seen_keys.add(key)
+                seen_keys.add(path)
                 bid += 1
-                tag = use.tag.upper() if getattr(use, 'tag', None) else 'DIV'
-                # depth
-                depth = 0
-                q = use
-                while q is not None:
-                    depth += 1
-                    q = getattr(q, 'parent', None)
+                depth = cache.depth(card)
                 # has_img
                 has_img = False
                 try:
-                    has_img = any(True for _ in use.css('img'))
+                    has_img = cache.has_img(card)
                 except Exception:
                     has_img = False
                 # links
-                links = []
+                links=[]
                 try:
-                    for la in use.css('a'):
+                    for la in cache.anchors(card):
                         href = la.attributes.get('href') or ''
-                        txt = la.text() or ''
+                        txta = cache.text(la)
                         if href:
-                            links.append({"href": href, "text": re.sub(r"\s+"," ", txt).strip()})
+                            links.append({"href": href, "text": _RE_WS.sub(" ", txta).strip()})
                 except Exception:
                     pass
-                try:
-                    text_v = _text_with_breaks_sel(use)
-                except Exception:
-                    text_v = use.text() or ''
+                text_v = cache.text(card).strip()
                 rows.append({
                     "block_id": str(bid),
-                    "tag": tag,
+                    "tag": _upper_tag(card.tag or 'div'),
                     "depth": str(depth),
                     "group_id": "hokudai-agr",
                     "path": path,
@@ -527,73 +564,63 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
                 })
                 if len(rows) >= max_blocks:
                     break
-            # Secondary: some themes use cards; include minimal .card blocks that contain role keywords
-            if len(rows) < max_blocks:
-                try:
-                    for card in root.css('.card'):
-                        try:
-                            txt = card.text() or ''
-                            if not _has_role_text(txt):
-                                continue
-                            tl = len(txt)
-                            if tl < TEXT_MIN or tl > TEXT_MAX:
-                                continue
-                        except Exception:
-                            continue
-                        path = _css_path(card)
-                        if path in seen_keys:
-                            continue
-                        seen_keys.add(path)
-                        bid += 1
-                        # depth
-                        depth = 0; q = card
-                        while q is not None:
-                            depth += 1
-                            q = getattr(q, 'parent', None)
-                        # has_img
-                        has_img = False
-                        try:
-                            has_img = any(True for _ in card.css('img'))
-                        except Exception:
-                            has_img = False
-                        # links
-                        links=[]
-                        try:
-                            for la in card.css('a'):
-                                href = la.attributes.get('href') or ''
-                                txta = la.text() or ''
-                                if href:
-                                    links.append({"href": href, "text": re.sub(r"\s+"," ", txta).strip()})
-                        except Exception:
-                            pass
-                        try:
-                            text_v = _text_with_breaks_sel(card)
-                        except Exception:
-                            text_v = card.text() or ''
-                        rows.append({
-                            "block_id": str(bid),
-                            "tag": (card.tag.upper() if getattr(card,'tag',None) else 'DIV'),
-                            "depth": str(depth),
-                            "group_id": "hokudai-agr",
-                            "path": path,
-                            "has_img": "TRUE" if has_img else "FALSE",
-                            "text": text_v[:TEXT_MAX],
-                            "links_json": json_dumps_safe(links),
-                        })
-                        if len(rows) >= max_blocks:
-                            break
-                except Exception:
-                    pass
-            if rows:
-                return rows[:max_blocks]
+        except Exception:
+            pass
+    return rows
+
+
+# hostname -> (path predicate, handler); handlers return [] to fall through to the generic path
+_HOST_HANDLERS: Dict[str, Tuple[Callable[[str], bool], Callable[[Node, int, "_TreeCache"], List[Dict[str, str]]]]] = {
+    "www2.fish.hokudai.ac.jp": (lambda path: "/faculty-member" in path, _fish_blocks),
+    "www.agr.hokudai.ac.jp": (lambda path: path.strip("/") == "r/faculty", _agr_blocks),
+}
+
+
+def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[Dict[str, str]] = None, prefer_role: Optional[bool] = None) -> List[Dict[str, str]]:
+    base_url = url
+    tree = HTMLParser(html)
+    # base
+    try:
+        base_el = next((b for b in tree.css("base") if b.attributes.get("href")), None)
+        if base_el:
+            base_url = urljoin(base_url, base_el.attributes.get("href") or "")
+    except Exception:
+        pass
+
+    root = tree.body or tree
+    _remove_unwanted(root)
+    _make_absolute(root, base_url)
+
+    # text / anchors / img / depth / sibling indices are asked for the same nodes repeatedly
+    # (golden climb re-scores shared ancestors, then rows re-query kept nodes)
+    cache = _TreeCache()
+    _t, _anchors, _has_img, _depth = cache.text, cache.anchors, cache.has_img, cache.depth
+
+    # Role-first extraction (structure-light): prioritize blocks anchored by role keywords
+    try:
+        pref = prefer_role if prefer_role is not None else (os.environ.get('PREFER_ROLE','').lower() in ('1','true','yes'))
+        if pref:
+            rows_rf: List[Dict[str,str]] = _role_first_blocks(url, root, max_blocks, cache)
+            if rows_rf:
+                return rows_rf[:max_blocks]
     except Exception:
         pass
 
+    # Host-specific listings (per-professor blocks)
+    pu = urlsplit(url)
+    handler = _HOST_HANDLERS.get(pu.hostname or "")
+    if handler is not None and handler[0](pu.path or ""):
+        try:
+            rows_h = handler[1](root, max_blocks, cache)
+            if rows_h:
+                return rows_h[:max_blocks]
+        except Exception:
+            pass
+
     # gather blocks
-    nodes: List[Node] = []
+    # one traversal for all block tags (document order)
     try:
-        for sel in BLOCK_TAGS:
-            nodes.extend(root.css(sel))
+        nodes: List[Node] = root.css(_BLOCK_SEL)
     except Exception:
         nodes = []
 
@@ -602,14 +629,15 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
         name_g = (golden.get("name") or "").strip()
         theme_g = (golden.get("theme") or "").strip()
         link_g = (golden.get("link") or "").strip()
+        # score() re-tests the same anchors for every ancestor it visits; classify each href once
+        personal_by_href: Dict[str, bool] = {}
         def looks_personal_href(href: str) -> bool:
-            h = href or ""
-            return any(p in h for p in ("/faculty-member/","/faculty/","/people/","/person/","/profile","/researcher","/staff/"))
-        def contains_text(n: "Node", s: str) -> bool:
-            try:
-                return bool(s) and (s in (n.text() or ""))
-            except Exception:
-                return False
+            r = personal_by_href.get(href)
+            if r is None:
+                r = personal_by_href[href] = bool(href) and _GOLDEN_PERSONAL_RE.search(href) is not None
+            return r
+        # golden name/theme and role titles as one alternation: a single scan per candidate text
+        seed_re = re.compile("|".join([re.escape(g) for g in (name_g, theme_g) if g] + [_ROLE_RE.pattern]))
         seeds: List[Node] = []
         # anchors first
         try:
@@ -622,28 +650,36 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
         # text matches (golden text or role titles)
         try:
             for cand in nodes:
-                if (name_g and contains_text(cand, name_g)) or (theme_g and contains_text(cand, theme_g)) or _has_role_text(cand.text() or ""):
+                if seed_re.search(_t(cand)):
                     seeds.append(cand)
         except Exception:
             pass
         # ascend to best container
         picked: List[Node] = []
         seen_paths: set[str] = set()
+        # many seeds climb through the same ancestors; score each node once
+        score_cache: Dict[int, Tuple[int,int,int,int,int,int,int]] = {}
         def score(n: "Node") -> Tuple[int,int,int,int,int,int,int]:
-            t = n.text() or ""
+            k = n.mem_id
+            sc = score_cache.get(k)
+            if sc is None:
+                sc = score_cache[k] = _score_impl(n)
+            return sc
+        def _score_impl(n: "Node") -> Tuple[int,int,int,int,int,int,int]:
+            t = _t(n)
             s_name = 2 if (name_g and (name_g in t)) else 0
             s_theme = 1 if (theme_g and (theme_g in t)) else 0
             s_glink = 0
             try:
                 if link_g:
-                    for a in n.css("a"):
+                    for a in _anchors(n):
                         if a.attributes.get("href") == link_g:
                             s_glink = 2; break
             except Exception:
                 pass
             s_plink = 0
             try:
-                for a in n.css("a"):
+                for a in _anchors(n):
                     if looks_personal_href(a.attributes.get("href") or ""):
                         s_plink = 1; break
             except Exception:
@@ -651,7 +687,7 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
             s_role = 1 if _has_role_text(t) else 0
             s_img = 0
             try:
-                s_img = 1 if any(True for _ in n.css("img")) else 0
+                s_img = 1 if _has_img(n) else 0
             except Exception:
                 s_img = 0
             tl = len(t)
@@ -660,15 +696,15 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
         for seed in seeds:
             best = seed
             best_sc = score(seed)
-            p = getattr(seed, "parent", None)
+            p = seed.parent
             steps = 0
             while p is not None and steps < 8:
                 sc = score(p)
                 if sc > best_sc:
                     best, best_sc = p, sc
-                p = getattr(p, "parent", None)
+                p = p.parent
                 steps += 1
-            path = _css_path(best)
+            path = cache.path(best)
             if path in seen_paths:
                 continue
             seen_paths.add(path)
@@ -680,31 +716,24 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
             bid = 0
             for n in picked:
                 bid += 1
-                tag = n.tag.upper()
-                depth = 0
-                p = n
-                while p is not None:
-                    depth += 1
-                    p = getattr(p, "parent", None)
+                tag = _upper_tag(n.tag)
+                depth = _depth(n)
                 has_img = False
                 try:
-                    has_img = any(True for _ in n.css("img"))
+                    has_img = _has_img(n)
                 except Exception:
                     has_img = False
-                path = _css_path(n)
+                path = cache.path(n)
                 links = []
                 try:
-                    for a in n.css("a"):
+                    for a in _anchors(n):
                         href = a.attributes.get("href") or ""
-                        txt = a.text() or ""
+                        txt = _t(a)
                         if href:
-                            links.append({"href": href, "text": re.sub(r"\s+", " ", txt).strip()})
+                            links.append({"href": href, "text": _RE_WS.sub(" ", txt).strip()})
                 except Exception:
                     pass
-                try:
-                    text_v = _text_with_breaks_sel(n)
-                except Exception:
-                    text_v = n.text() or ""
+                text_v = _t(n).strip()
                 rows.append({
                     "block_id": str(bid),
                     "tag": tag,
@@ -717,66 +746,40 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
                 })
             return rows[:max_blocks]
 
-    # group by parent+signature
-    grouped: Dict[str, List[Node]] = {}
+    # group by parent+signature (tuple keys; the group_id string is only built for kept groups)
+    grouped: Dict[Tuple[str, str, Tuple[Tuple[str, int], ...]], List[Node]] = {}
+    # longest stripped text per group, kept while grouping so ranking needs no second pass
+    group_max: Dict[Tuple[str, str, Tuple[Tuple[str, int], ...]], int] = {}
     for n in nodes:
-        try:
-            txt = _text_with_breaks_sel(n)
-        except Exception:
-            txt = n.text() or ""
-        if not txt.strip():
+        tl = len(_t(n).strip())
+        if not tl:
             continue
-        parent_tag = n.parent.tag if n.parent else "root"
-        sig = f"{parent_tag}|{n.tag}|{_child_signature(n)}"
-        grouped.setdefault(sig, []).append(n)
-
-    # flatten by taking representatives from each group until max_blocks
-    kept: List[Tuple[str, Node]] = []
-    # sort groups by size then by max text length in group
-    def group_score(nodes: List[Node]) -> int:
-        try:
-            return max(len(_text_with_breaks_sel(x)) for x in nodes)
-        except Exception:
-            return 0
-    ordered_groups = sorted(grouped.items(), key=lambda kv: (-len(kv[1]), -group_score(kv[1])))
-    for gid, arr in ordered_groups:
-        for n in arr:
-            kept.append((gid, n))
-            if len(kept) >= max_blocks:
-                break
-        if len(kept) >= max_blocks:
-            break
-
-    rows: List[Dict[str, str]] = []
-    bid = 0
-    for gid, n in kept:
-        bid += 1
-        tag = n.tag.upper()
-        depth = 0
-        p = n
-        while p is not None:
-            depth += 1
-            p = p.parent
+        p = n.parent
+        key = (sys.intern(p.tag) if p else "root", sys.intern(n.tag), _child_signature(n))
+        grouped.setdefault(key, []).append(n)
+        if tl > group_max.get(key, 0):
+            group_max[key] = tl
+
+    def _block_row(n: Node, bid: int, gid: str) -> Dict[str, str]:
+        tag = _upper_tag(n.tag)
+        depth = _depth(n)
         has_img = False
         try:
-            has_img = any(True for _ in n.css("img"))
+            has_img = _has_img(n)
         except Exception:
             has_img = False
-        path = _css_path(n)
+        path = cache.path(n)
         links = []
         try:
-            for a in n.css("a"):
+            for a in _anchors(n):
                 href = a.attributes.get("href") or ""
-                txt = a.text() or ""
+                txt = _t(a)
                 if href:
-                    links.append({"href": href, "text": re.sub(r"\s+", " ", txt).strip()})
+                    links.append({"href": href, "text": _RE_WS.sub(" ", txt).strip()})
         except Exception:
             pass
-        try:
-            text_v = _text_with_breaks_sel(n)
-        except Exception:
-            text_v = n.text() or ""
-        rows.append({
+        text_v = _t(n).strip()
+        return {
             "block_id": str(bid),
             "tag": tag,
             "depth": str(depth),
@@ -785,13 +788,31 @@ def blockify_html(url: str, html: str, max_blocks: int = 300, golden: Optional[D
             "has_img": "TRUE" if has_img else "FALSE",
             "text": text_v[:TEXT_MAX],
             "links_json": json_dumps_safe(links),
-        })
+        }
+
+    # take groups by size then by max text length in group, emitting rows until max_blocks.
+    # A heap (ties broken by first-seen order, as a stable sort would) pops only the groups needed.
+    heap = [(-len(arr), -group_max[key], i, key) for i, (key, arr) in enumerate(grouped.items())]
+    heapq.heapify(heap)
+
+    rows: List[Dict[str, str]] = []
+    bid = 0
+    while heap and bid < max_blocks:
+        key = heapq.heappop(heap)[3]
+        gid = _group_id(key)
+        for n in grouped[key]:
+            bid += 1
+            rows.append(_block_row(n, bid, gid))
+            if bid >= max_blocks:
+                break
     return rows
 
 
 def json_dumps_safe(obj) -> str:
-    import json
+    if not obj:
+        # most blocks carry no links
+        return "[]"
     try:
-        return json.dumps(obj, ensure_ascii=False)
+        return _dumps(obj)
     except Exception:
         return "[]"
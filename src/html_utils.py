@@ -1,9 +1,104 @@
 from __future__ import annotations
-from bs4 import BeautifulSoup
-from typing import Any
+from functools import lru_cache
+from typing import Any, TYPE_CHECKING
 import re
 from urllib.parse import urljoin
 
+import soupsieve
+
+try:
+    from selectolax.lexbor import LexborHTMLParser, LexborNode
+except ImportError:
+    # optional: without selectolax only the bs4 branches below are reachable
+    LexborHTMLParser = LexborNode = None
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# The helpers below accept either a bs4 Tag/soup or a selectolax tree/node.
+# (isinstance, not hasattr: bs4's Tag.__getattr__ turns unknown attributes into find() calls.)
+# Empty tuples when selectolax is missing, so every isinstance check is simply False.
+_NODE_TYPES = (LexborNode,) if LexborNode is not None else ()
+_TREE_TYPES = (LexborHTMLParser,) if LexborHTMLParser is not None else ()
+_SEL_TYPES = _NODE_TYPES + _TREE_TYPES
+_WS_RE = re.compile(r"\s+")
+# bs4 side: compile each selector string once instead of going through Tag.select's per-call setup
+_css_compile = lru_cache(maxsize=256)(soupsieve.compile)
+
+
+# Unlike soupsieve's tag.select(), lexbor's node.css() also matches the context node itself, and
+# reports a node once per matching selector of a comma list. The helpers below give bs4's
+# results: descendants only, each once, in document order.
+def _select_one(root: Any, css: str):
+    if isinstance(root, _NODE_TYPES):
+        n = root.css_first(css)
+        if n is None or n.mem_id != root.mem_id:
+            return n
+        # the context node came first (it precedes its descendants); take the next distinct match
+        return next((m for m in root.css(css) if m.mem_id != root.mem_id), None)
+    if isinstance(root, _TREE_TYPES):
+        return root.css_first(css)
+    return _css_compile(css).select_one(root)
+
+
+def _select_all(root: Any, css: str) -> list:
+    if isinstance(root, _SEL_TYPES):
+        nodes = root.css(css)
+        if "," in css:
+            nodes = list({n.mem_id: n for n in nodes}.values())
+        if isinstance(root, _NODE_TYPES) and nodes and nodes[0].mem_id == root.mem_id:
+            del nodes[0]
+        return nodes
+    return _css_compile(css).select(root)
+
+
+def _attr(el: Any, name: str) -> str | None:
+    if isinstance(el, _NODE_TYPES):
+        # lexbor gives None for a valueless attribute (<a href>); bs4 gives ""
+        attrs = el.attributes
+        return (attrs[name] or "") if name in attrs else None
+    return el.get(name)
+
+
+def _text(el: Any, sep: str = " ", strip: bool = False) -> str:
+    if isinstance(el, _SEL_TYPES):
+        return _lexbor_text(el.root if isinstance(el, _TREE_TYPES) else el, sep, strip)
+    return el.get_text(sep, strip=strip)
+
+
+# bs4's get_text skips script/style/template strings
+_NON_TEXT_PARENTS = frozenset({"script", "style", "template"})
+
+
+def _in_preformatted(n: LexborNode) -> bool:
+    p = n.parent
+    while p is not None:
+        if p.tag in ("pre", "textarea"):
+            return True
+        p = p.parent
+    return False
+
+
+def _lexbor_text(el: LexborNode | None, sep: str, strip: bool) -> str:
+    # Same joining as bs4's get_text(sep, strip=strip): node.text(strip=True) would keep the empty
+    # whitespace-only nodes (doubling separators) and include script/style text.
+    if el is None:
+        return ""
+    parts = []
+    for n in el.traverse(include_text=True):
+        if n.tag != "-text" or n.parent.tag in _NON_TEXT_PARENTS:
+            continue
+        t = n.text_content
+        if strip:
+            t = t.strip()
+            if not t:
+                continue
+        elif not t.strip() and not _in_preformatted(n):
+            # bs4 collapses whitespace-only strings to a single "\n" or " " outside pre/textarea
+            t = "\n" if "\n" in t else " "
+        parts.append(t)
+    return sep.join(parts)
+
 # Placeholders that should never be interpreted as CSS selectors
 PLACEHOLDER_LITERALS = {"name", "theme", "link", "名前", "テーマ", "リンク", "href", "alt"}
 
@@ -11,7 +106,7 @@ PLACEHOLDER_LITERALS = {"name", "theme", "link", "名前", "テーマ", "リン
 def compress_ws(s: str | None) -> str:
     if not s:
         return ""
-    return re.sub(r"\s+", " ", s).strip()
+    return _WS_RE.sub(" ", s).strip()
 
 
 def is_effective_selector(selector: str | None) -> bool:
@@ -23,6 +118,8 @@ def is_effective_selector(selector: str | None) -> bool:
     return True
 
 
+# the same few configured selectors are split once per item and field; the result is an immutable tuple
+@lru_cache(maxsize=256)
 def split_selector_attr(selector: str | None) -> tuple[str | None, str | None]:
     if not is_effective_selector(selector):
         return None, None
@@ -43,24 +140,24 @@ def safe_select_text_soup(root: BeautifulSoup | Any, selector: str | None) -> st
     css, attr = split_selector_attr(selector)
     if not css:
         return ""
-    el = root.select_one(css)
+    el = _select_one(root, css)
     if not el:
         return ""
     if attr:
-        return compress_ws(el.get(attr) or "")
-    return compress_ws(el.get_text(separator=" "))
+        return compress_ws(_attr(el, attr) or "")
+    return compress_ws(_text(el, " "))
 
 def select_text_all(root: BeautifulSoup | Any, selector: str | None, sep: str = " ") -> str:
     css, attr = split_selector_attr(selector)
     if not css:
         return ""
-    els = root.select(css)
+    els = _select_all(root, css)
     vals: list[str] = []
     for el in els:
         if attr:
-            vals.append(compress_ws(el.get(attr) or ""))
+            vals.append(compress_ws(_attr(el, attr) or ""))
         else:
-            vals.append(compress_ws(el.get_text(" ", strip=True)))
+            vals.append(compress_ws(_text(el, " ", strip=True)))
     vals = [v for v in vals if v]
     return compress_ws(sep.join(vals))
 
@@ -68,19 +165,19 @@ def select_text_all(root: BeautifulSoup | Any, selector: str | None, sep: str =
 def safe_select_href_soup(root: BeautifulSoup | Any, selector: str | None, base_url: str) -> str:
     css, attr = split_selector_attr(selector)
     if css:
-        a = root.select_one(css)
+        a = _select_one(root, css)
         if a:
             if attr:
-                val = a.get(attr)
+                val = _attr(a, attr)
                 if not val:
                     return ""
                 if attr.lower() in {"href", "src", "data-href", "data-url"}:
                     return urljoin(base_url, val)
                 return compress_ws(val)
-            if a.has_attr("href"):
-                return urljoin(base_url, a.get("href") or "")
+            if _attr(a, "href") is not None:
+                return urljoin(base_url, _attr(a, "href") or "")
     # Fallback: first link within root
-    a = root.select_one("a[href]")
-    if a and a.has_attr("href"):
-        return urljoin(base_url, a.get("href") or "")
+    a = _select_one(root, "a[href]")
+    if a and _attr(a, "href") is not None:
+        return urljoin(base_url, _attr(a, "href") or "")
     return ""
@@ -1,32 +1,46 @@
 import re
+from functools import lru_cache
 
 JP = r"[一-龥々〆ヵヶ]"
 NAME_RE = re.compile(rf"({JP}{{1,4}})[ \u3000]+({JP}{{1,6}})")
 TITLE_RE = re.compile(
     r"(教授|准教授|助教|講師|助教授|特任教授|特任准教授|特任講師|非常勤講師|客員教授|客員准教授|客員講師|名誉教授|研究員|特別研究員|助手|主任)")
+_BRACKET_RE = re.compile(r"[（\(【\[][^)】\]]+[）\)】\]]")
+_SPACE_TRANS = str.maketrans({"\u3000": " ", "・": " "})
+# 空白・中黒・肩書き・括弧書きの連なりを 1 回の置換で半角スペース 1 つに畳む
+# (それぞれ先頭文字が重ならないので、順に sub した結果と一致する)
+_NOISE_RUN_RE = re.compile(rf"(?:[\s・]|{TITLE_RE.pattern}|{_BRACKET_RE.pattern})+")
+_BRACKET_WS_RUN_RE = re.compile(rf"(?:\s|{_BRACKET_RE.pattern})+")
+_PUNCT_TRANS = str.maketrans(dict.fromkeys("（）()[]【】", " "))
+THEME_SPLIT = r"[、，,/／・\n]+"
+_THEME_SPLIT_TRANS = {**_PUNCT_TRANS, **str.maketrans(dict.fromkeys("、，,/／・", "\n"))}
+_JP_BLOCK_RE = re.compile(rf"{JP}{{2,4}}")
+_JP_SPLIT_RE = re.compile(rf"({JP}{{2,3}})({JP}{{2,4}})")
 
+# targets.json 由来のパターンは種類が少ないので、コンパイル結果を使い回す
+_compile = lru_cache(maxsize=64)(re.compile)
+
+# 純粋関数で、同じ氏名テキストが行・ページ・フォールバックをまたいで何度も来るので結果ごと覚える
+@lru_cache(maxsize=4096)
 def normalize_name(text: str, cleanup_regex: str | None = None) -> str | None:
-    s = text or ""
-    # normalize spaces and middle dot
-    s = s.replace("\u3000", " ").replace("・", " ")
-    # remove titles (twice for safety)
-    s = TITLE_RE.sub(" ", s)
     if cleanup_regex:
-        s = re.sub(cleanup_regex, " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    s = TITLE_RE.sub(" ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    # remove bracketed phrases
-    s = re.sub(r"[（\(【\[][^)】\]]+[）\)】\]]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+        # the cleanup pattern must see the text after spaces/titles are normalized, so keep the order
+        s = TITLE_RE.sub(" ", (text or "").translate(_SPACE_TRANS))
+        s = _compile(cleanup_regex).sub(" ", s)
+        s = _BRACKET_WS_RUN_RE.sub(" ", s).strip()
+    else:
+        s = _NOISE_RUN_RE.sub(" ", text or "").strip()
     m = NAME_RE.search(s)
     if not m:
         # collect JP blocks (2-4) and use first two
-        blocks = re.findall(rf"{JP}{{2,4}}", s)
+        blocks = _JP_BLOCK_RE.findall(s)
         if len(blocks) >= 2:
             return f"{blocks[0]} {blocks[1]}".strip()
+        # 2 文字以上の漢字の連なりが無ければ、4 文字以上を要する下の分割も当たらない
+        if not blocks:
+            return None
         # fallback: continuous 4–6 kanji split 2+rest
-        m2 = re.search(rf"({JP}{{2,3}})({JP}{{2,4}})", s)
+        m2 = _JP_SPLIT_RE.search(s)
         if m2:
             return f"{m2.group(1)} {m2.group(2)}".strip()
         return None
@@ -37,21 +51,15 @@ def normalize_name(text: str, cleanup_regex: str | None = None) -> str | None:
     return f"{g1} {g2}".strip()
 
 def normalize_themes(s: str, split_pattern: str, exclude_re: str | None = None, max_topics: int = 12) -> str:
-    s = re.sub(r"[（）\(\)\[\]【】]", " ", s or "")
-    parts = re.split(split_pattern, s)
-    out: list[str] = []
-    for p in parts:
-        p = p.strip(" 　")
-        if not p:
-            continue
-        if exclude_re and re.search(exclude_re, p):
-            continue
-        if len(p) > 30:
-            continue
-        out.append(p)
-    # 重複除去（順序保持）
-    seen, uniq = set(), []
-    for p in out:
-        if p not in seen:
-            seen.add(p); uniq.append(p)
-    return " / ".join(uniq[:max_topics])
+    if split_pattern == THEME_SPLIT:
+        # 既定の区切りは全て 1 文字なので、括弧除去と一緒に "\n" へ寄せて str.split で切る
+        # (連続区切りで出る空要素は下の pop("") で落ちる)
+        parts = (s or "").translate(_THEME_SPLIT_TRANS).split("\n")
+    else:
+        parts = _compile(split_pattern).split((s or "").translate(_PUNCT_TRANS))
+    exclude = _compile(exclude_re) if exclude_re else None
+    # 重複除去（順序保持）を dict.fromkeys で先に行い、フィルタは一意な値だけに掛ける
+    uniq = dict.fromkeys([p.strip(" 　") for p in parts])
+    uniq.pop("", None)
+    out = [p for p in uniq if len(p) <= 30 and not (exclude and exclude.search(p))]
+    return " / ".join(out[:max_topics])
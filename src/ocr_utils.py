@@ -1,5 +1,5 @@
 from __future__ import annotations
-import os, re, datetime
+import contextlib, os, re, datetime
 from typing import Optional, Tuple, Dict, List
 from .normalize import normalize_name
 import time as _time
@@ -27,13 +27,14 @@ def try_render_screenshot(url: str, dynamic: bool = False, wait_ms: int = 1500)
             browser = p.chromium.launch()
             page = browser.new_page(viewport={"width": 1280, "height": 2000})
             page.goto(url, wait_until="networkidle")
+            # 固定 sleep はせず、読み込み完了を待つ（wait_ms は上限。間に合わなければ現状で撮る）
             if wait_ms:
-                import time
-                time.sleep(wait_ms/1000)
+                with contextlib.suppress(Exception):
+                    page.wait_for_function("document.readyState === 'complete'", timeout=wait_ms)
             path = os.path.join("evidence", "_screenshots")
             os.makedirs(path, exist_ok=True)
             out = os.path.join(path, "shot_" + str(int(datetime.datetime.now().timestamp())) + ".png")
-            page.screenshot(path=out, full_page=True)
+            page.screenshot(path=out, full_page=True, animations="disabled")
             browser.close()
             return out
     except Exception:
@@ -45,6 +46,19 @@ def _env_int(name: str, default: int) -> int:
     except Exception:
         return default
 
+# 氏名の姓/名だけを包む狭い要素は人物ブロック（近い li/article/.card 等、なお短ければ最大 2 つ上の親）に引き上げる。
+# 姓と名が同じブロックに引き上がることが多いので、同一要素はブラウザ側で落としてから返す
+_ENUM_TARGETS_JS = """els => { const seen = new Set(); return els.map(el => {
+  const cls = (el.getAttribute('class') || '').toLowerCase();
+  const b = el.getBoundingClientRect();
+  if ((el.innerText || '').trim().length > 4 && !/family|given|surname|first|last|name/.test(cls)
+      && b.width >= 160 && b.height >= 50) return el;
+  let t = el.closest('li, article, .card, .member, .teacher, .profile, .faculty-member, .item-faculty, .entry') || el;
+  for (let i = 0; i < 2 && (t.innerText || '').trim().length < 6; i++) t = t.parentElement || t;
+  return t;
+}).filter(t => !seen.has(t) && seen.add(t)); }"""
+
+
 def enumerate_dom_items(
     url: str,
     item_selectors: List[str],
@@ -77,7 +91,6 @@ def enumerate_dom_items(
     items: List[Dict[str, str]] = []
     try:
         from playwright.sync_api import sync_playwright  # type: ignore
-        from time import sleep
         with sync_playwright() as p:
             browser = p.chromium.launch()
             page = browser.new_page(viewport={"width": 1280, "height": 2000})
@@ -87,8 +100,10 @@ def enumerate_dom_items(
             except Exception:
                 pass
             page.goto(url, wait_until="networkidle")
-            if dynamic:
-                sleep(1.0)
+            # 動的ページは固定 1 秒待たず、いずれかの項目セレクタが現れた時点で進む（上限 1 秒）
+            if dynamic and item_selectors:
+                with contextlib.suppress(Exception):
+                    page.wait_for_selector(", ".join(item_selectors), timeout=1000)
             out_dir = os.path.join("evidence", "_screenshots")
             os.makedirs(out_dir, exist_ok=True)
 
@@ -106,51 +121,19 @@ def enumerate_dom_items(
                     print(f"INFO enum: sel={sel} found={len(handles)} collected={len(items)} shots={shots}")
                 except Exception:
                     pass
-                for h in handles:
+                # 狭い氏名パーツ要素の人物ブロックへの引き上げと outerHTML の取得を、
+                # 要素ごとの往復ではなくセレクタごとに 2 回の evaluate で済ませる
+                try:
+                    targets = page.evaluate_handle(_ENUM_TARGETS_JS, handles) if handles else None
+                    htmls = targets.evaluate("ts => ts.map(t => t.outerHTML || '')") if targets else []
+                except Exception:
+                    htmls = []
+                target_handles = None
+                for i, html in enumerate(htmls):
                     if len(items) >= max_items:
                         break
                     if (_time.time() - start_ts) * 1000 >= overall_timeout_ms:
                         break
-                    # Choose target element: escalate narrow name-part elements to closest container block
-                    target = h
-                    try:
-                        cls = (h.get_attribute("class") or "").lower()
-                    except Exception:
-                        cls = ""
-                    try:
-                        inner_txt = h.evaluate("el => (el.innerText||'').trim()") or ""
-                    except Exception:
-                        inner_txt = ""
-                    try:
-                        has_nameish_class = any(k in cls for k in ("family", "given", "surname", "first", "last", "name"))
-                    except Exception:
-                        has_nameish_class = False
-                    is_narrow = False
-                    try:
-                        box = h.bounding_box() or {"width": 0, "height": 0}
-                        is_small_box = box.get("width", 0) < 160 or box.get("height", 0) < 50
-                    except Exception:
-                        is_small_box = False
-                    if (len(inner_txt) <= 4) or has_nameish_class or is_small_box:
-                        # escalate to a likely person-block container; if still too small, go up to two more ancestors
-                        try:
-                            target = h.evaluate_handle("el => el.closest('li, article, .card, .member, .teacher, .profile, .faculty-member, .item-faculty, .entry') || el")
-                        except Exception:
-                            target = h
-                        # second-chance: if target text still short (likely single block), go up parents
-                        try:
-                            for _ in range(2):
-                                t_txt = target.evaluate("el => (el.innerText||'').trim()") or ""
-                                if len(t_txt) >= 6:
-                                    break
-                                parent = target.evaluate_handle("el => el.parentElement || el")
-                                target = parent
-                        except Exception:
-                            pass
-                    try:
-                        html = target.evaluate("el => el.outerHTML") or ""
-                    except Exception:
-                        html = ""
                     if not html or html in seen_html:
                         continue
                     seen_html.add(html)
@@ -160,7 +143,9 @@ def enumerate_dom_items(
                         shot_name = f"item_{int(datetime.datetime.now().timestamp())}_{seq}.png"
                         shot_path_tmp = os.path.join(out_dir, shot_name)
                         try:
-                            target.screenshot(path=shot_path_tmp, timeout=action_timeout_ms)
+                            if target_handles is None:
+                                target_handles = targets.get_properties()
+                            target_handles[str(i)].as_element().screenshot(path=shot_path_tmp, timeout=action_timeout_ms)
                             shot_path = shot_path_tmp
                             shots += 1
                         except Exception:
@@ -177,19 +162,30 @@ def enumerate_dom_items(
     return items
 
 
+_OCR_MAX_SIDE = 2000
+
+
 def run_ocr(image_path: str) -> Tuple[str, bool]:
     if not (_has_module("pytesseract") and _has_module("PIL")):
         return "", False
     try:
         from PIL import Image  # type: ignore
         import pytesseract  # type: ignore
-        text = pytesseract.image_to_string(Image.open(image_path), lang="jpn+eng")
+        # 大きすぎるスクショは縮め、グレースケールにしてから渡す（tesseract 内部の変換と巨大バッファを省く）
+        with Image.open(image_path) as img:
+            if max(img.size) > _OCR_MAX_SIDE:
+                img.thumbnail((_OCR_MAX_SIDE, _OCR_MAX_SIDE))
+            gray = img.convert("L")
+        text = pytesseract.image_to_string(gray, lang="jpn+eng")
         return text, True
     except Exception:
         return "", False
 
 
 NAME_RE = re.compile(r"[一-龥々〆ヵヶ]{1,4}[\u3000 ・ ]+[一-龥々〆ヵヶ]{1,6}")
+THEME_HINT_RE = re.compile(r"(研究|専門|テーマ|キーワード|Research|Interests)")
+URL_RE = re.compile(r"https?://[\w\-\./#?=&%]+")
+_WS_RE = re.compile(r"\s+")
 
 
 def extract_from_ocr_text(text: str) -> Dict[str, str]:
@@ -200,41 +196,48 @@ def extract_from_ocr_text(text: str) -> Dict[str, str]:
     if m:
         n = m.group(0).replace("\u3000", " ").replace("・", " ").strip()
         out["name"] = normalize_name(n) or n
+    lines = text.splitlines()
     if not out["name"]:
-        for ln in text.splitlines():
+        for ln in lines:
             n2 = normalize_name(ln)
             if n2:
                 out["name"] = n2
                 break
-    for ln in text.splitlines():
+    for ln in lines:
         l = ln.strip()
         if not l:
             continue
-        if re.search(r"(研究|専門|テーマ|キーワード|Research|Interests)", l):
-            out["theme"] = re.sub(r"\s+", " ", l)
+        if THEME_HINT_RE.search(l):
+            out["theme"] = _WS_RE.sub(" ", l)
             break
-    m2 = re.search(r"https?://[\w\-\./#?=&%]+", text)
+    m2 = URL_RE.search(text)
     if m2:
         out["link"] = m2.group(0)
     return out
 
 
+# CSS の {} を含むので str.format は使わず連結する
+_EVIDENCE_HEAD = '<!doctype html><meta charset="utf-8"><style>body{font-family:sans-serif;line-height:1.6} mark{background:#ff0}</style><body>'
+_EVIDENCE_TAIL = '</body>'
+
+
 def make_evidence_html(page_html: str, match_texts: Dict[str, str]):
     frag = page_html or ""
     highlighted = frag
-    for k in ("name", "theme", "link"):
-        v = match_texts.get(k) or ""
+    # str.replace は memchr ベースで、1 本の正規表現の交替で 1 回走査するより速い。
+    # 同じ値が重複していると二重に <mark> されるので先に除く
+    for v in dict.fromkeys(match_texts.get(k) or "" for k in ("name", "theme", "link")):
         if not v:
             continue
         try:
             highlighted = highlighted.replace(v, f"<mark>{v}</mark>")
         except Exception:
             pass
-    tpl = '<!doctype html><meta charset="utf-8"><style>body{font-family:sans-serif;line-height:1.6} mark{background:#ff0}</style><body>{}</body>'
-    return tpl.format(frag), tpl.format(highlighted)
+    return _EVIDENCE_HEAD + frag + _EVIDENCE_TAIL, _EVIDENCE_HEAD + highlighted + _EVIDENCE_TAIL
 
 
 def escape_html(s: str) -> str:
+    # 置換文字列が複数文字なので str.translate より replace の連鎖の方が速い
     return (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
@@ -248,11 +251,12 @@ def save_evidence(univ: str, grad: str, run_id: str, seq: int, original_html: st
         '<style>body{font-family:sans-serif;line-height:1.6} mark{background:#ff0}</style>',
         f"<h3>Evidence (run_id={run_id})</h3>",
         f"<p><b>Source:</b> <a href='{source_url}'>{source_url}</a></p>",
-        f"<details><summary>OCR Raw Text</summary><pre>{escape_html(ocr_text_raw)}</pre></details>",
-        f"<details><summary>Normalized Text</summary><pre>{escape_html(normalized_text)}</pre></details>",
+        # 大きな本文は f-string や join で連結し直さず、そのまま順に書き出す
+        "<details><summary>OCR Raw Text</summary><pre>", escape_html(ocr_text_raw), "</pre></details>",
+        "<details><summary>Normalized Text</summary><pre>", escape_html(normalized_text), "</pre></details>",
         "<h4>Original Fragment</h4>", original_html,
         "<h4>Highlighted Fragment</h4>", highlighted_html,
     ]
     with open(path, "w", encoding="utf-8") as f:
-        f.write("".join(body))
+        f.writelines(body)
     return path
@@ -1,13 +1,39 @@
 from __future__ import annotations
 from bs4 import BeautifulSoup
+from functools import lru_cache
 from typing import Any
 import re
-from .normalize import normalize_name, normalize_themes
-from .html_utils import select_text_all
+from .normalize import THEME_SPLIT, normalize_name, normalize_themes
+from .html_utils import select_text_all, _css_compile
+
+# フォールバック候補（カード/リスト共通）。セレクタはモジュール読み込み時に一度だけコンパイルする
+_FALLBACK_CARDS = ".card, .profile, .profile-card, .facultyCard, .teacher, .member, .item-faculty, .faculty-member, article, .entry"
+_FALLBACK_ITEMS = "li, .member, .teacher, .card, .item, tr, .profile, article, .entry, .list-item, .list-group-item, .facultyList li"
+_FALLBACK_NAME = (".name", ".teacher-name", ".ttl", ".title", ".heading", "[class*='name']")
+_THEME_SELS = (".desc", ".description", ".research", ".field", ".keyword", ".content", ".text", "p", "li")
+_FALLBACK_THEME = tuple(_css_compile(s) for s in _THEME_SELS)
+_FALLBACK_THEME_ANY = _css_compile(", ".join(_THEME_SELS))
+_A_HREF = _css_compile("a[href]")
+_CELLS = _css_compile("td, th")
+
+def _fallback_theme_node(el: Any) -> Any:
+    # 候補は結合セレクタ 1 回の走査で集め、優先順で最初に当たるセレクタの（文書順で）先頭要素を返す
+    cands = _FALLBACK_THEME_ANY.select(el)
+    if cands:
+        for css in _FALLBACK_THEME:
+            for n in cands:
+                if css.match(n):
+                    return n
+    return None
+
+@lru_cache(maxsize=4)
+def _parse_once(html: str) -> BeautifulSoup:
+    # parse_table/cards/list は同じページに何度も呼ばれるため、解析済みツリーを共有する（読み取り専用で使うこと）
+    return BeautifulSoup(html, "lxml")
 
 def _table_with_headers(soup: BeautifulSoup, table_selector: str | None, header_keywords: list[str] | None) -> Any:
     if table_selector:
-        for t in soup.select(table_selector):
+        for t in _css_compile(table_selector).select(soup):
             hdr = " ".join(th.get_text(" ", strip=True) for th in t.find_all("th"))
             if not header_keywords or all(k in hdr for k in header_keywords):
                 return t
@@ -19,7 +45,7 @@ def _table_with_headers(soup: BeautifulSoup, table_selector: str | None, header_
     return None
 
 def parse_table(html: str, meta: dict) -> list[dict]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_once(html)
     sels = meta.get("selectors", {})
     table = _table_with_headers(
         soup,
@@ -34,14 +60,16 @@ def parse_table(html: str, meta: dict) -> list[dict]:
     cleanup = sels.get("name_cleanup_regex")
 
     rules = meta.get("split_rules", {})
-    split_pattern = rules.get("theme_split", r"[、，,/／・\n]+")
+    split_pattern = rules.get("theme_split", THEME_SPLIT)
     exclude_re = rules.get("theme_exclude")
     max_topics = int(rules.get("max_topics", 12))
 
+    # 使うのは name/theme 列までなので、セルはその数だけ取れば足りる
+    max_idx = max(name_idx, theme_idx)
     recs: list[dict] = []
     for tr in table.find_all("tr"):
-        cells = tr.find_all(["td", "th"])
-        if len(cells) <= max(name_idx, theme_idx):
+        cells = _CELLS.select(tr, limit=max_idx + 1)
+        if len(cells) <= max_idx:
             continue
         name_text = cells[name_idx].get_text("\n", strip=True)
         nm = normalize_name(name_text, cleanup)
@@ -58,7 +86,7 @@ def parse_table(html: str, meta: dict) -> list[dict]:
     return recs
 
 def parse_cards(html: str, meta: dict) -> list[dict]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_once(html)
     sels = meta.get("selectors", {})
     card_sel = sels.get("card_selector")
     name_sel = sels.get("name_selector")
@@ -67,17 +95,16 @@ def parse_cards(html: str, meta: dict) -> list[dict]:
     cleanup = sels.get("name_cleanup_regex")
 
     rules = meta.get("split_rules", {})
-    split_pattern = rules.get("theme_split", r"[、，,/／・\n]+")
+    split_pattern = rules.get("theme_split", THEME_SPLIT)
     exclude_re = rules.get("theme_exclude")
     max_topics = int(rules.get("max_topics", 12))
 
-    # フォールバック候補（カード系も幅広く）
-    fallback_cards = ".card, .profile, .profile-card, .facultyCard, .teacher, .member, .item-faculty, .faculty-member, article, .entry"
-    fallback_name = [name_sel] if name_sel else [".name", ".teacher-name", ".ttl", ".title", ".heading", "[class*='name']"]
-    fallback_theme = [theme_sel] if theme_sel else [".desc", ".description", ".research", ".field", ".keyword", ".content", ".text", "p", "li"]
+    fallback_name = (name_sel,) if name_sel else _FALLBACK_NAME
+    theme_css = _css_compile(theme_sel) if theme_sel else None
+    link_css = _css_compile(link_sel) if link_sel else _A_HREF
 
     recs: list[dict] = []
-    for card in soup.select(card_sel or fallback_cards):
+    for card in _css_compile(card_sel or _FALLBACK_CARDS).select(soup):
         # name
         name_text = ""
         for sel in fallback_name:
@@ -86,60 +113,58 @@ def parse_cards(html: str, meta: dict) -> list[dict]:
             name_text = select_text_all(card, sel)
             if name_text:
                 break
-        if not name_text:
+        # 全文フォールバックは 1 回だけ走査する（既に全文で正規化済みなら再試行は同じ結果なので省く）
+        full_text = not name_text
+        if full_text:
             name_text = card.get_text(" ", strip=True)
         nm = normalize_name(name_text, cleanup)
-        if (not nm and name_text) or (nm and " " not in nm):
+        if not full_text and ((not nm and name_text) or (nm and " " not in nm)):
             nm2 = normalize_name(card.get_text(" ", strip=True), cleanup)
             if nm2:
                 nm = nm2
+        link_node = None
         if not nm:
             # As a final fallback, use anchor text if available
-            a_fallback = card.select_one(link_sel) if link_sel else (card.select_one("a[href]") or None)
-            if a_fallback:
-                nm3 = normalize_name(a_fallback.get_text(" ", strip=True), cleanup)
+            link_node = link_css.select_one(card)
+            if link_node:
+                nm3 = normalize_name(link_node.get_text(" ", strip=True), cleanup)
                 if nm3:
                     nm = nm3
         if not nm:
             continue
         # theme
-        theme_node = None
-        for sel in fallback_theme:
-            if not sel:
-                continue
-            theme_node = card.select_one(sel)
-            if theme_node:
-                break
+        theme_node = theme_css.select_one(card) if theme_css else _fallback_theme_node(card)
         theme_raw = theme_node.get_text("\n", strip=True) if theme_node else ""
         theme = normalize_themes(theme_raw, split_pattern, exclude_re, max_topics)
         # link
         link = ""
-        link_node = card.select_one(link_sel) if link_sel else (card.select_one("a[href]") or None)
+        if link_node is None:  # 名前のフォールバックで引いていなければここで引く
+            link_node = link_css.select_one(card)
         if link_node:
             link = link_node.get("href") or ""
         recs.append({"name": nm, "theme": theme, "link": link})
     return recs
 
 def parse_list(html: str, meta: dict) -> list[dict]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_once(html)
     sels = meta.get("selectors", {})
-    item_sel = sels.get("item_selector") or "li, .member, .teacher, .card, .item, tr, .profile, article, .entry, .list-item, .list-group-item, .facultyList li"
+    item_sel = sels.get("item_selector") or _FALLBACK_ITEMS
     name_sel = sels.get("name_selector")
     theme_sel = sels.get("theme_selector")
     link_sel = sels.get("link_selector")
     cleanup = sels.get("name_cleanup_regex")
 
     rules = meta.get("split_rules", {})
-    split_pattern = rules.get("theme_split", r"[、，,/／・\n]+")
+    split_pattern = rules.get("theme_split", THEME_SPLIT)
     exclude_re = rules.get("theme_exclude")
     max_topics = int(rules.get("max_topics", 12))
 
-    # フォールバック候補（リスト系も幅広く）
-    fallback_name = [name_sel] if name_sel else [".name", ".teacher-name", ".ttl", ".title", ".heading", "[class*='name']"]
-    fallback_theme = [theme_sel] if theme_sel else [".desc", ".description", ".research", ".field", ".keyword", ".content", ".text", "p", "li"]
+    fallback_name = (name_sel,) if name_sel else _FALLBACK_NAME
+    theme_css = _css_compile(theme_sel) if theme_sel else None
+    link_css = _css_compile(link_sel) if link_sel else _A_HREF
 
     recs: list[dict] = []
-    for it in soup.select(item_sel):
+    for it in _css_compile(item_sel).select(soup):
         # name
         name_text = ""
         for sel in fallback_name:
@@ -148,34 +173,32 @@ def parse_list(html: str, meta: dict) -> list[dict]:
             name_text = select_text_all(it, sel)
             if name_text:
                 break
-        if not name_text:
+        # 全文フォールバックは 1 回だけ走査する（既に全文で正規化済みなら再試行は同じ結果なので省く）
+        full_text = not name_text
+        if full_text:
             name_text = it.get_text(" ", strip=True)
         nm = normalize_name(name_text, cleanup)
-        if (not nm and name_text) or (nm and " " not in nm):
+        if not full_text and ((not nm and name_text) or (nm and " " not in nm)):
             nm2 = normalize_name(it.get_text(" ", strip=True), cleanup)
             if nm2:
                 nm = nm2
+        link_node = None
         if not nm:
-            a_fallback = it.select_one(link_sel) if link_sel else (it.select_one("a[href]") or None)
-            if a_fallback:
-                nm3 = normalize_name(a_fallback.get_text(" ", strip=True), cleanup)
+            link_node = link_css.select_one(it)
+            if link_node:
+                nm3 = normalize_name(link_node.get_text(" ", strip=True), cleanup)
                 if nm3:
                     nm = nm3
         if not nm:
             continue
         # theme
-        theme_node = None
-        for sel in fallback_theme:
-            if not sel:
-                continue
-            theme_node = it.select_one(sel)
-            if theme_node:
-                break
+        theme_node = theme_css.select_one(it) if theme_css else _fallback_theme_node(it)
         theme_raw = theme_node.get_text("\n", strip=True) if theme_node else ""
         theme = normalize_themes(theme_raw, split_pattern, exclude_re, max_topics)
         # link
         link = ""
-        link_node = it.select_one(link_sel) if link_sel else (it.select_one("a[href]") or None)
+        if link_node is None:  # 名前のフォールバックで引いていなければここで引く
+            link_node = link_css.select_one(it)
         if link_node:
             link = link_node.get("href") or ""
         recs.append({"name": nm, "theme": theme, "link": link})
@@ -1,103 +1,128 @@
-from bs4 import BeautifulSoup
 import re
+from bs4 import BeautifulSoup, Tag
+from .html_utils import _attr, _select_all, _select_one, _text
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    # selectolax が無い環境（CI など）では bs4 で解析する
+    LexborHTMLParser = None
 
 NAME_RE = re.compile(r"[一-龥々〆ヵヶ]{1,4}[\u3000 ]+[一-龥々〆ヵヶ]{1,4}")
 ROLE_RE = re.compile(r"(教授|准教授|特任教授|助教|担当者)")
+_WS_RE = re.compile(r"\s+")
+_NAME_SPLIT_RE = re.compile(r"([一-龥々〆ヵヶ]{2,4})([一-龥々〆ヵヶ]{2,4})$")
+_PUNCT_TRANS = str.maketrans(dict.fromkeys("（）()[]【】", " "))
+_THEME_SPLIT_TRANS = {**_PUNCT_TRANS, **str.maketrans(dict.fromkeys("、，,/／・", "\n"))}
+_THEME_EXCLUDE_RE = re.compile(r"(Journal|Vol\.|pp\.|書房)")
+_TABLE_HEAD_RE = re.compile(r"(専門|研究|担当)")
+_THEME_HINT_RE = re.compile(r"(専門|研究|マーケ|消費|サイエン)")
+_THEME_EL_HINT_RE = re.compile(r"(専門|研究|マーケ|消費|統計|サイエン)")
+
+_THEME_EL_SELS = (".field", ".expertise", ".desc", ".tags", "p", "li")
+_THEME_EL_ANY = ", ".join(_THEME_EL_SELS)
+
+
+def _is_simple_match(n, sel: str) -> bool:
+    # _THEME_EL_SELS は単一クラスかタグ名だけなので、その要素自身が当たるかを直接見る
+    if isinstance(n, Tag):
+        if sel[0] == ".":
+            return sel[1:] in (n.get("class") or ())
+        return n.name == sel
+    if sel[0] == ".":
+        return sel[1:] in (n.attributes.get("class") or "").split()
+    return n.tag == sel
 
 def norm_name(s: str) -> str:
     s = (s or "")
     s = ROLE_RE.sub("", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     m = NAME_RE.search(s)
     if m:
         return m.group(0)
-    m2 = re.match(r"([一-龥々〆ヵヶ]{2,4})([一-龥々〆ヵヶ]{2,4})$", s)
+    m2 = _NAME_SPLIT_RE.match(s)
     return f"{m2.group(1)} {m2.group(2)}" if m2 else s
 
 def norm_theme(s: str) -> str:
     if not s:
         return ""
-    s = re.sub(r"[（）\(\)\[\]【】]", " ", s)
-    parts = [p.strip() for p in re.split(r"[、，,/／・\n]+", s) if p.strip()]
-    parts = [p for p in parts if not re.search(r"(Journal|Vol\.|pp\.|書房)", p)]
-    out, seen = [], set()
-    for p in parts:
-        if p not in seen:
-            seen.add(p); out.append(p)
+    # 区切りは全て 1 文字なので括弧除去と一緒に "\n" へ寄せて split し、重複除去してから除外語を判定する
+    uniq = dict.fromkeys([p.strip() for p in s.translate(_THEME_SPLIT_TRANS).split("\n")])
+    uniq.pop("", None)
+    out = [p for p in uniq if not _THEME_EXCLUDE_RE.search(p)]
     return " / ".join(out[:12])
 
-def _table_candidates(soup: BeautifulSoup):
+def _table_candidates(tree: "LexborHTMLParser | BeautifulSoup"):
     c = []
-    for t in soup.select("table"):
-        ths = " ".join(th.get_text(" ", strip=True) for th in t.select("th"))
+    for t in _select_all(tree, "table"):
+        ths = " ".join(_text(th, " ", strip=True) for th in _select_all(t, "th"))
         score = 0
-        if re.search(r"(専門|研究|担当)", ths):
+        if _TABLE_HEAD_RE.search(ths):
             score += 2
-        if len(t.select("tr")) >= 5:
+        if len(_select_all(t, "tr")) >= 5:
             score += 1
         c.append((score, t))
     return [t for score, t in sorted(c, key=lambda x: -x[0]) if score > 0]
 
 def extract_auto(html: str):
-    soup = BeautifulSoup(html, "lxml")
+    # Lexbor で解析する（無ければ bs4）。テキストは html_utils._text で bs4 の get_text と同じ連結にそろえる
+    tree = LexborHTMLParser(html) if LexborHTMLParser is not None else BeautifulSoup(html, "lxml")
     rows = []
 
     # 1) table優先
-    for table in _table_candidates(soup):
-        trs = table.select("tr")
+    for table in _table_candidates(tree):
+        trs = _select_all(table, "tr")
         if not trs:
             continue
-        maxcols = max(len(tr.find_all(["td", "th"])) for tr in trs)
-        counts = []
-        for ci in range(maxcols):
-            col = [
-                tr.find_all(["td", "th"])[ci].get_text(" ", strip=True)
-                if len(tr.find_all(["td", "th"])) > ci
-                else ""
-                for tr in trs
-            ]
-            name_hits = sum(1 for v in col if NAME_RE.search(v))
-            theme_hits = sum(1 for v in col if re.search(r"(専門|研究|マーケ|消費|サイエン)", v))
-            counts.append((ci, name_hits, theme_hits))
-        name_idx = max(counts, key=lambda x: x[1])[0]
-        theme_idx = max(counts, key=lambda x: x[2])[0]
-        for tr in trs:
-            tds = tr.find_all(["td", "th"])
+        # 各行のセルを一度だけ取り出し、列ごとの走査で使い回す
+        cells = [_select_all(tr, "td, th") for tr in trs]
+        texts = [[_text(td, " ", strip=True) for td in tds] for tds in cells]
+        # 列ごとの氏名/テーマらしさを 1 回の走査で数える（同数なら左の列、は max の先勝ちで維持）
+        maxcols = max(len(tds) for tds in cells)
+        name_hits = [0] * maxcols
+        theme_hits = [0] * maxcols
+        for tx in texts:
+            for ci, v in enumerate(tx):
+                if NAME_RE.search(v):
+                    name_hits[ci] += 1
+                if _THEME_HINT_RE.search(v):
+                    theme_hits[ci] += 1
+        name_idx = max(range(maxcols), key=name_hits.__getitem__)
+        theme_idx = max(range(maxcols), key=theme_hits.__getitem__)
+        for tds, tx in zip(cells, texts):
             if len(tds) <= max(name_idx, theme_idx):
                 continue
-            name = norm_name(tds[name_idx].get_text(" ", strip=True))
+            name = norm_name(tx[name_idx])
             if not NAME_RE.search(name):
                 continue
-            theme = norm_theme(tds[theme_idx].get_text(" ", strip=True))
-            url = ""
-            a = tds[name_idx].select_one("a[href]")
-            if a and a.get("href"):
-                url = a["href"]
+            theme = norm_theme(tx[theme_idx])
+            a = _select_one(tds[name_idx], "a[href]")
+            url = (_attr(a, "href") or "") if a is not None else ""
             rows.append({"教授名（JP)": name, "教授名（JP）": name, "研究テーマ（JP）": theme, "リンク（JP）": url})
         if rows:
             return rows
 
     # 2) cards / list 推定
-    cards = soup.select(".card, .profile, .teacher, .member, .list, ul, ol")
+    cards = _select_all(tree, ".card, .profile, .teacher, .member, .list, ul, ol")
     for block in cards:
-        items = block.select(".card, .profile, .teacher, li, .member") or [block]
+        items = _select_all(block, ".card, .profile, .teacher, li, .member") or [block]
         for it in items:
-            text = it.get_text(" ", strip=True)
+            text = _text(it, " ", strip=True)
             nm = NAME_RE.search(text)
             if not nm:
                 continue
             name = norm_name(nm.group(0))
+            # 候補は結合セレクタ 1 回の走査で集め、優先順に各セレクタの先頭要素だけをヒント語で判定する
+            cands = _select_all(it, _THEME_EL_ANY)
             theme_el = None
-            for sel in [".field", ".expertise", ".desc", ".tags", "p", "li"]:
-                el = it.select_one(sel)
-                if el and re.search(r"(専門|研究|マーケ|消費|統計|サイエン)", el.get_text()):
+            for sel in _THEME_EL_SELS if cands else ():
+                el = next((n for n in cands if _is_simple_match(n, sel)), None)
+                if el is not None and _THEME_EL_HINT_RE.search(_text(el, "")):
                     theme_el = el
                     break
-            theme = norm_theme(theme_el.get_text(" ", strip=True) if theme_el else "")
-            url = ""
-            a = it.select_one("a[href]")
-            if a and a.get("href"):
-                url = a["href"]
+            theme = norm_theme(_text(theme_el, " ", strip=True) if theme_el is not None else "")
+            a = _select_one(it, "a[href]")
+            url = (_attr(a, "href") or "") if a is not None else ""
             rows.append({"教授名（JP)": name, "教授名（JP）": name, "研究テーマ（JP）": theme, "リンク（JP）": url})
     return rows
 
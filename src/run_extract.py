@@ -3,9 +3,9 @@ import csv, json, datetime, sys, os
 from pathlib import Path
 from collections import defaultdict
 
-from .fetch import fetch_html, fetch_dynamic_html
-from .parse import parse_table, parse_cards, parse_list
-from .html_utils import safe_select_text_soup, safe_select_href_soup, is_effective_selector, select_text_all
+from .fetch import fetch_html, fetch_dynamic_html, fetch_many
+from .parse import parse_table, parse_cards, parse_list, _parse_once
+from .html_utils import safe_select_text_soup, safe_select_href_soup, is_effective_selector, select_text_all, _select_one, _select_all
 from .ocr_utils import enumerate_dom_items, run_ocr, extract_from_ocr_text, make_evidence_html, save_evidence, has_playwright, has_ocr
 from .normalize import normalize_name
 from bs4 import BeautifulSoup
@@ -13,6 +13,15 @@ from urllib.parse import urljoin, urlparse
 import hashlib
 import time
 import re
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from selectolax.lexbor import LexborHTMLParser, SelectolaxError
+except ImportError:
+    # selectolax は任意。無ければ一覧ページも bs4（_parse_once）で解析する
+    LexborHTMLParser = None
 
 COLUMNS = [
     "大学名","研究科","専攻名","氏名（漢字）",
@@ -44,7 +53,7 @@ def _adapter_for(host: str) -> dict:
 
 
 def _classify_page_type(html: str) -> str:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_once(html)
     has_table = bool(soup.select_one("table th, table thead"))
     has_cards = bool(soup.select_one(".card, .profile, .profile-card, .facultyCard, .teacher, .member, article, .entry"))
     if has_table and not has_cards:
@@ -64,32 +73,41 @@ def extract_by_type(html: str, page_type: str, selectors: dict):
     return [{"name": n, "theme": t, "link": u} for n,t,u in parse_list(html, {"selectors": selectors})]
 
 
-def guess_item_selector(soup: BeautifulSoup) -> str | None:
+def guess_item_selector(soup: BeautifulSoup | LexborHTMLParser) -> str | None:
     for sel in DEFAULT_ITEM_SELECTORS:
-        if soup.select_one(sel):
+        if _select_one(soup, sel) is not None:
             return sel
     return None
 
 
 def extract_list_page(html: str, base_url: str, selectors: dict) -> list[dict]:
-    soup = BeautifulSoup(html, 'lxml')
+    # Lexbor で解析する。soupsieve 独自の擬似クラスなど Lexbor が解釈できないセレクタなら bs4 で引き直す
+    if LexborHTMLParser is None:
+        return _extract_list_rows(_parse_once(html), base_url, selectors)
+    try:
+        return _extract_list_rows(LexborHTMLParser(html), base_url, selectors)
+    except SelectolaxError:
+        return _extract_list_rows(_parse_once(html), base_url, selectors)
 
+
+def _extract_list_rows(soup: BeautifulSoup | LexborHTMLParser, base_url: str, selectors: dict) -> list[dict]:
     item_sel = selectors.get('item_selector')
     if not is_effective_selector(item_sel):
         item_sel = guess_item_selector(soup)
-    items = soup.select(item_sel) if item_sel else []
+    items = _select_all(soup, item_sel) if item_sel else []
 
     rows: list[dict] = []
     if not items:
         # No page-level fallback here (per requirements)
         return rows
 
+    lab_sel, name_sel, theme_sel, link_sel, tag_sel = (selectors.get(k) for k in ('lab_selector', 'name_selector', 'theme_selector', 'link_selector', 'tag_selector'))
     for it in items:
-        lab = safe_select_text_soup(it, selectors.get('lab_selector')) or ""
-        name = safe_select_text_soup(it, selectors.get('name_selector')) or ""
-        theme = safe_select_text_soup(it, selectors.get('theme_selector')) or ""
-        link = safe_select_href_soup(it, selectors.get('link_selector'), base_url) or ""
-        tag = safe_select_text_soup(it, selectors.get('tag_selector')) or ""
+        lab = safe_select_text_soup(it, lab_sel) or ""
+        name = safe_select_text_soup(it, name_sel) or ""
+        theme = safe_select_text_soup(it, theme_sel) or ""
+        link = safe_select_href_soup(it, link_sel, base_url) or ""
+        tag = safe_select_text_soup(it, tag_sel) or ""
         rows.append(dict(lab=lab, name=name, theme=theme, link=link, tag=tag))
     return rows
 
@@ -115,6 +133,13 @@ def _compute_row_key(name: str, link: str, lab: str, html_frag: str, seq: str |
 
 
 _JAPANESE_CHAR_RE = re.compile(r"[\u4E00-\u9FFF\u3040-\u30FF]")
+_WS_RE = re.compile(r"\s+")
+_NAME_DELIM_RE = re.compile(r"[|／/｜]| - | – | — |,")
+_PAREN_RE = re.compile(r"\s*\(.*?\)\s*")
+_LATIN_WORD_RE = re.compile(r"^[A-Za-zÀ-ÖØ-öø-ÿ'\-]+$")
+_PEOPLE_PATH_RE = re.compile(r"/(people|person|persons|profiles?|researcher|researchers|staff)/[A-Za-z0-9\-_.]+", re.IGNORECASE)
+# adapters.json patterns: a handful per host, matched for every candidate link
+_rx = lru_cache(maxsize=256)(re.compile)
 _LATIN_NAME_RE = re.compile(r"^[A-Za-zÀ-ÖØ-öø-ÿ][A-Za-zÀ-ÖØ-öø-ÿ'\-.]+(?: [A-Za-zÀ-ÖØ-öø-ÿ][A-Za-zÀ-ÖØ-öø-ÿ'\-.]+){0,3}$")
 _TITLE_TOKENS = {
     # English/General
@@ -128,8 +153,8 @@ _TITLE_TOKENS = {
 
 def _strip_titles(s: str) -> str:
     t = (s or "").strip()
-    t = re.sub(r"\s+", " ", t)
-    parts = [p for p in re.split(r"[|／/｜]| - | – | — |,", t) if p]
+    t = _WS_RE.sub(" ", t)
+    parts = [p for p in _NAME_DELIM_RE.split(t) if p]
     if parts:
         t = parts[0].strip()
     toks = t.replace(".", " ").split()
@@ -140,13 +165,13 @@ def clean_person_name(s: str) -> str:
     s = (s or "").strip()
     if not s:
         return ""
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     if len(s) > 64:
         return ""
     if any(x in s for x in ("http://","https://","@")):
         return ""
     cand = _strip_titles(s)
-    cand = re.sub(r"\s*\(.*?\)\s*", "", cand).strip()
+    cand = _PAREN_RE.sub("", cand).strip()
     if _JAPANESE_CHAR_RE.search(cand):
         # Japanese-like if it contains JP chars and not too many delimiters
         if len(cand) >= 2:
@@ -157,7 +182,7 @@ def clean_person_name(s: str) -> str:
         return cand
     # Heuristic: 2-4 words, letters/hyphen/apostrophe only (allow middle dot)
     ws = cand.replace("・", " ").split()
-    if 1 <= len(ws) <= 4 and all(re.match(r"^[A-Za-zÀ-ÖØ-öø-ÿ'\-]+$", w) for w in ws):
+    if 1 <= len(ws) <= 4 and all(_LATIN_WORD_RE.match(w) for w in ws):
         return cand
     return ""
 
@@ -184,13 +209,13 @@ def looks_individual_link(link: str, page_url: str) -> bool:
         # Adapter-driven rules first
         ad = _adapter_for(host)
         for gh in ad.get("generic_list_hints", []) or []:
-            if re.search(gh, path):
+            if _rx(gh).search(path):
                 return False
         for ex in ad.get("exclude_url_substrings", []) or []:
             if ex in path:
                 return False
         for pat in ad.get("personal_url_patterns", []) or []:
-            if re.search(pat, path, flags=re.IGNORECASE):
+            if _rx(pat, re.IGNORECASE).search(path):
                 return True
         # Hokkaido fish: /faculty-member/<slug>
         if "/faculty-member/" in path:
@@ -205,7 +230,7 @@ def looks_individual_link(link: str, page_url: str) -> bool:
         if "/r/lab/" in path:
             return True
         # People/Profile directories of other sites
-        if re.search(r"/(people|person|persons|profiles?|researcher|researchers|staff)/[A-Za-z0-9\-_.]+", path, flags=re.IGNORECASE):
+        if _PEOPLE_PATH_RE.search(path):
             return True
     except Exception:
         # best-effort fallback
@@ -236,21 +261,22 @@ _TITLE_WORDS = [
     "Lecturer","Senior Lecturer","Instructor","Research Fellow","Researcher","Senior Researcher","Postdoctoral Researcher","Postdoc","Visiting Scholar",
 ]
 
+# Patterns: Name + Title, Title + Name
+_NAME_CHARSET = r"[A-Za-zÀ-ÖØ-öø-ÿ'\-\u4E00-\u9FFF\u3040-\u30FF・]{1,30}"
+_TITLE_JOIN = "|".join(re.escape(w) for w in _TITLE_WORDS)
+_NAME_BY_TITLE_RES = (
+    re.compile(rf"({_NAME_CHARSET})[ 　]*?(?:{_TITLE_JOIN})", re.IGNORECASE),
+    re.compile(rf"(?:{_TITLE_JOIN})[ 　]*?({_NAME_CHARSET})", re.IGNORECASE),
+)
+
 def find_name_by_title(text: str) -> str:
     t = (text or "").strip()
     if not t:
         return ""
     # Normalize spaces
-    t = re.sub(r"\s+", " ", t)
-    # Patterns: Name + Title, Title + Name
-    name_charset = r"[A-Za-zÀ-ÖØ-öø-ÿ'\-\u4E00-\u9FFF\u3040-\u30FF・]{1,30}"
-    title_join = "|".join(re.escape(w) for w in _TITLE_WORDS)
-    patterns = [
-        rf"({name_charset})[ 　]*?(?:{title_join})",
-        rf"(?:{title_join})[ 　]*?({name_charset})",
-    ]
-    for pat in patterns:
-        m = re.search(pat, t, flags=re.IGNORECASE)
+    t = _WS_RE.sub(" ", t)
+    for rx in _NAME_BY_TITLE_RES:
+        m = rx.search(t)
         if m:
             cand = m.group(1).strip()
             cand = clean_person_name(cand)
@@ -262,6 +288,8 @@ def find_name_by_title(text: str) -> str:
 def run_target(t: dict) -> list[dict]:
     uni, grad, major = t.get("university", ""), t.get("graduate_school", ""), t.get("major", "")
     merged: dict[str, dict] = {}
+    # 行キーごとのテーマ要素（順序付き・最大 12 件）。毎回文字列を split し直さずに積み増す
+    theme_parts: dict[str, dict[str, None]] = {}
 
     def merge(name: str, theme: str, url: str, source: str, today: str, run_id: str, lab: str = "", tag: str = "", row_key: str | None = None):
         # Strictly use provided row_key for de-duplication to avoid over-merge
@@ -278,15 +306,24 @@ def run_target(t: dict) -> list[dict]:
             }
             return
         # テーマ結合（重複回避）
-        a = merged[key]["研究テーマ（スラッシュ区切り）"]
         b = theme or ""
         if b:
-            parts = [x.strip() for x in (a+" / "+b).split("/") if x.strip()] if a else [p.strip() for p in b.split("/") if p.strip()]
-            seen, out = set(), []
-            for p in parts:
-                if p not in seen:
-                    seen.add(p); out.append(p)
-            merged[key]["研究テーマ（スラッシュ区切り）"] = " / ".join(out[:12])
+            parts = theme_parts.get(key)
+            changed = parts is None
+            if changed:
+                # 初回の結合で、登録時のテーマ文字列を要素に分解しておく
+                uniq = dict.fromkeys(x.strip() for x in merged[key]["研究テーマ（スラッシュ区切り）"].split("/"))
+                uniq.pop("", None)
+                parts = theme_parts[key] = dict.fromkeys(islice(uniq, 12))
+            for x in b.split("/"):
+                if len(parts) >= 12:
+                    break
+                x = x.strip()
+                if x and x not in parts:
+                    parts[x] = None
+                    changed = True
+            if changed:
+                merged[key]["研究テーマ（スラッシュ区切り）"] = " / ".join(parts)
         if not merged[key]["個人ページURL"] and url:
             merged[key]["個人ページURL"] = url
         if not merged[key]["研究室名称（JP）"] and lab:
@@ -316,7 +353,7 @@ def run_target(t: dict) -> list[dict]:
         # Always fetch/scan page info when URL is provided, even if fixed values are complete.
         # Purpose: CSS empty should still trigger fallback extraction to gather page info.
         if url:
-            html = fetch_dynamic_html(url) if t.get("dynamic") else fetch_html(url)
+            html = fetch_dynamic_html(url, wait_selector=sel.get("item_selector")) if t.get("dynamic") else fetch_html(url)
             # DOM enumeration first
             try:
                 item_selectors = []
@@ -553,8 +590,8 @@ def run_target(t: dict) -> list[dict]:
                         name_val = cleaned_name
             if not f.get("theme") and theme_val:
                 try:
-                    from .normalize import normalize_themes
-                    theme_val = normalize_themes(theme_val, r"[、，,/／・\n]+", None, 12) or theme_val
+                    from .normalize import THEME_SPLIT, normalize_themes
+                    theme_val = normalize_themes(theme_val, THEME_SPLIT, None, 12) or theme_val
                 except Exception:
                     pass
             if link_val:
@@ -716,28 +753,46 @@ def run_target(t: dict) -> list[dict]:
         "dynamic": False,
     }]
 
-    for p in pages:
-        url = p["url"]
-        if not url:
-            continue
-        html = fetch_dynamic_html(url) if p.get("dynamic") else fetch_html(url)
-        # Auto classify when unspecified
-        rows = extract_by_type(html, p.get("page_type", "auto"), p.get("selectors", {}))
-        run_id = os.environ.get("GITHUB_RUN_ID") or os.environ.get("RUN_ID") or today.replace("-", "")
-        for r in rows:
-            name_v = r.get("name", "")
-            name_v = normalize_name(name_v) or name_v
-            link_v = r.get("link", "")
-            if link_v:
-                try:
-                    link_v = urljoin(url, link_v)
-                except Exception:
-                    pass
-            # Skip rows with no name and no link
-            if not (name_v or link_v):
+    # static pages are fetched concurrently up front; failures are retried below so the original error surfaces
+    prefetched = fetch_many(p.get("url") for p in pages if not p.get("dynamic")) if len(pages) > 1 else {}
+    # 取得済みの静的ページは解析（CPU 処理）を先にプロセスプールへ投げ、結果はページ順に取り出す
+    static = [i for i, p in enumerate(pages) if p.get("url") and not p.get("dynamic") and prefetched.get(p["url"])]
+    px = ProcessPoolExecutor(max_workers=min(len(static), os.cpu_count() or 1)) if len(static) > 1 else None
+    # 例外で抜けてもワーカープロセスを残さないよう、未着手の解析は取り消して必ず閉じる
+    try:
+        parses = {i: px.submit(extract_by_type, prefetched[pages[i]["url"]], pages[i].get("page_type", "auto"), pages[i].get("selectors", {}))
+                  for i in static} if px else {}
+        for i, p in enumerate(pages):
+            url = p["url"]
+            if not url:
                 continue
-            row_key = _compute_row_key(name_v or "", link_v or "", "", "", None)
-            merge(name_v, r.get("theme", ""), link_v, url, today, run_id, row_key=row_key)
+            if i in parses:
+                rows = parses[i].result()
+            else:
+                if p.get("dynamic"):
+                    html = fetch_dynamic_html(url, wait_selector=(p.get("selectors") or {}).get("item_selector"))
+                else:
+                    html = prefetched.get(url) or fetch_html(url)
+                # Auto classify when unspecified
+                rows = extract_by_type(html, p.get("page_type", "auto"), p.get("selectors", {}))
+            run_id = os.environ.get("GITHUB_RUN_ID") or os.environ.get("RUN_ID") or today.replace("-", "")
+            for r in rows:
+                name_v = r.get("name", "")
+                name_v = normalize_name(name_v) or name_v
+                link_v = r.get("link", "")
+                if link_v:
+                    try:
+                        link_v = urljoin(url, link_v)
+                    except Exception:
+                        pass
+                # Skip rows with no name and no link
+                if not (name_v or link_v):
+                    continue
+                row_key = _compute_row_key(name_v or "", link_v or "", "", "", None)
+                merge(name_v, r.get("theme", ""), link_v, url, today, run_id, row_key=row_key)
+    finally:
+        if px:
+            px.shutdown(cancel_futures=True)
 
     return list(merged.values())
 